@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+import melgym
+
+from gymnasium.wrappers import RescaleAction, NormalizeObservation
+
+from melgym.utils.sweep import SweepRunner
+
+
+def apply_wrappers(env):
+    """
+    Applies a series of Gymnasium wrappers to the environment.
+
+    Args:
+        env (gym.Env): The environment to wrap.
+    Returns:
+        gym.Env: The wrapped environment.
+    """
+    env = RescaleAction(env, min_action=-1, max_action=1)
+    env = NormalizeObservation(env)
+    return env
+
+
+if __name__ == '__main__':
+    sweep = SweepRunner(
+        env_id='pressure-v0',
+        env_grid={
+            'control_horizon': [5, 10],
+            'max_action_value': [2.5, 5.0]
+        },
+        agent_grid={
+            'ent_coef': [0.0, 0.01],
+            'n_steps': [100],
+            'batch_size': [100]
+        },
+        total_timesteps=10_000,
+        seeds=[0, 1],
+        env_wrapper=apply_wrappers
+    )
+    results = sweep.run()
+    print(f"{len(results)} runs finished. Results saved in {sweep.results_path}")
@@ -4,19 +4,39 @@ Generic MELCOR environment.
 Custom environments must inherit from this class.
 """
 
+import glob
+import json
 import os
+import queue
 import shutil
 import subprocess
+import tempfile
+import threading
+import uuid
+import warnings
 
 import gymnasium as gym
 import numpy as np
 
-from melkit.toolkit import Toolkit
 from typing import Optional
 from datetime import datetime
+from time import perf_counter
 
-from ..utils.constants import OUTPUT_DIR, MELCOR_PATH, MELGEN_PATH
+from ..utils.constants import OUTPUT_DIR, MELCOR_PATH, MELGEN_PATH, RESTART_FILE
 from ..utils.exceptions import MelgymError, MelgymWarning
+from ..utils.edf import EdfSchema
+from ..utils.cache import TransitionCache, state_key
+from ..utils.cpu import available_cpus, nice_command, spawn_affinity, thread_vars, valid_cpus
+from ..utils.tf import TF_MAX_PAIRS, find_control_tfs, tf_records
+from ..utils.metrics import MetricsRegistry
+from ..utils.deck import ControlPlan
+
+
+CF_BLOCK_TITLE = 'CONTROLLERS'
+TF_BLOCK_TITLE = 'TABULAR FUNCTIONS'
+TF_SEGMENT_GAP = 1e-3  # Fraction of the control horizon between consecutive TF segments
+CHECKPOINT_FILES = ('state.json', 'MELIN', RESTART_FILE)
+EDF_TIME_TOLERANCE = 1e-3  # Fraction of the control horizon allowed between the last EDF row and TEND
 
 
 class MelcorEnv(gym.Env):
@@ -24,6 +44,10 @@ class MelcorEnv(gym.Env):
     MELCOR control environment.
 
     This environment redefines CF scale factors to control the variables recorded in the EDF. Between restarts, each CFnnn00 entry (automatically included in the MELCOR input) is rewritten after a specified number of timesteps, as defined by the control horizon.
+
+    The MELCOR model is validated when the environment is created, and the records rewritten between restarts are located once in a compiled control plan (see melgym.utils.deck).
+
+    Alternatively, with TF actuation, actions are written as breakpoints of the tabular functions referenced by the controlled CFs, which allows simulating open-loop plans of several control intervals in a single MELCOR execution (see step_plan()).
     """
 
     def __init__(
@@ -35,7 +59,20 @@ class MelcorEnv(gym.Env):
         control_horizon: int = 10,
         output_dir: Optional[str] = None,
         melgen_path: Optional[str] = None,
-        melcor_path: Optional[str] = None
+        melcor_path: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        cache_size: int = 10 * 1024 ** 3,
+        action_dtype: type = np.float32,
+        obs_dtype: type = np.float32,
+        cf_precision: int = 8,
+        cpus: Optional[list[int]] = None,
+        niceness: int = 0,
+        n_threads: Optional[int] = None,
+        pool_size: int = 0,
+        pool_dir: Optional[str] = None,
+        actuation: str = 'cf',
+        control_tfs: Optional[list[str]] = None,
+        metrics: Optional[MetricsRegistry] = None
     ):
         """
         Initializes the MELCOR environment.
@@ -50,6 +87,19 @@ class MelcorEnv(gym.Env):
             render_mode (Optional[str]): Mode for rendering the environment.
             melgen_path (Optional[str]): Path to the MELGEN executable. If None, the default path in exec directory is used.
             melcor_path (Optional[str]): Path to the MELCOR executable. If None, the default path in exec directory is used.
+            cache_dir (Optional[str]): Directory of the transition cache. If None, caching is disabled and every step runs MELCOR.
+            cache_size (int): Maximum size of the transition cache, in bytes. Least recently used transitions are evicted first.
+            action_dtype (type): Data type of the action space.
+            obs_dtype (type): Data type of the observation space and of the returned observations.
+            cf_precision (int): Number of decimal digits of the CF scale factors written to the MELCOR input (scientific notation).
+            cpus (Optional[list[int]]): Cores the MELGEN/MELCOR processes are pinned to. If None, processes are not pinned. See melgym.utils.cpu.env_cpu_sets.
+            niceness (int): Niceness increment of the MELGEN/MELCOR processes.
+            n_threads (Optional[int]): Thread limit of the MELGEN/MELCOR processes (OMP_NUM_THREADS, etc.). If None, the number of pinned cores is used, if any.
+            pool_size (int): Number of episode directories initialized ahead of time by a background worker. If 0, every reset runs MELGEN synchronously.
+            pool_dir (Optional[str]): Directory where pre-initialized episodes are stored, in a private subdirectory of each environment (so it can be shared). If None, a sibling of the output directory is used. It should be in the same filesystem as the output directory.
+            actuation (str): Actuation backend. 'cf' rewrites the CF scale factors; 'tf' writes actions into the tabular functions referenced by the controlled CFs (TAB-FUN CFs of TIME).
+            control_tfs (Optional[list[str]]): TF of each controlled CF in 'tf' actuation. If None, the TF referenced in the CFnnn05 record of each CF is used.
+            metrics (Optional[MetricsRegistry]): Registry where runtime metrics (steps, MELCOR and reset times, failures, pool depth, etc.) are recorded, labeled by output directory. If None, no metrics are recorded.
         """
 
         # Files and paths
@@ -64,7 +114,6 @@ class MelcorEnv(gym.Env):
 
         self.melin_path = os.path.join(self.output_dir, 'MELIN')
         self.melog_path = os.path.join(self.output_dir, 'MELOG')
-        self.edf_path = os.path.join(self.output_dir, 'MELEDF')
 
         self.melgen_path = melgen_path if melgen_path is not None else MELGEN_PATH
         self.melcor_path = melcor_path if melcor_path is not None else MELCOR_PATH
@@ -77,37 +126,115 @@ class MelcorEnv(gym.Env):
             raise FileNotFoundError(
                 f"MELCOR executable not found at {self.melcor_path}")
 
-        self.toolkit = None
+        # Process placement
+        self.cpus = valid_cpus(cpus)
+        self.niceness = niceness
+        self.process_prefix = nice_command(niceness)
+        self.n_cpus = len(self.cpus or available_cpus())
+        if n_threads is None and cpus:
+            n_threads = len(cpus)
+        self.process_env = {**os.environ, **thread_vars(n_threads)} if n_threads else None
+
+        # CPU usage of the MELGEN/MELCOR processes
+        self.cpu_time = 0.0
+        self.run_time = 0.0
+        self.last_cpu_utilization = 0.0
+        self.last_run_time = 0.0
+
+        # Running MELGEN/MELCOR processes, terminated on close()
+        self.processes = set()
+        self.processes_lock = threading.Lock()
 
         # Observation and action spaces
         self.control_cfs = control_cfs
-        self.controlled_values = Toolkit(self.melcor_model).get_edf_vars()
-        if 'TIME' in self.controlled_values:
-            self.controlled_values.remove('TIME')
+
+        if actuation not in ('cf', 'tf'):
+            raise MelgymError(f"Unsupported actuation backend: {actuation}")
+        self.actuation = actuation
+
+        # Deck validation and control plan, reused by every episode and step
+        self.control_plan = ControlPlan.from_deck(
+            self.melcor_model, control_cfs, control_horizon,
+            TF_BLOCK_TITLE if actuation == 'tf' else CF_BLOCK_TITLE,
+            redefine_cfs=(actuation == 'cf'))
+        self.melin_lines = list(self.control_plan.lines)
+
+        self.control_tfs = find_control_tfs(self.melcor_model, control_cfs, control_tfs) \
+            if actuation == 'tf' else None
+        self.edf_schema = EdfSchema.from_deck(self.melcor_model)
+        self.controlled_values = list(self.edf_schema.variables)
+
+        # EDF files and columns read at every step, in controlled_values order
+        self.edf_columns = [
+            (package, os.path.join(self.output_dir, package.file_name),
+             np.array([package.column(var) for var in package.columns[1:]], dtype=np.intp))
+            for package in self.edf_schema.packages
+        ]
+        self.edf_path = self.edf_columns[0][1]
 
         self.action_space = gym.spaces.Box(
             low=min_action_value,
             high=max_action_value,
             shape=(len(control_cfs),),
-            dtype=np.float16
+            dtype=action_dtype
         )
 
         n_obs = len(self.controlled_values)
         self.observation_space = gym.spaces.Box(
-            low=-np.inf * np.ones(n_obs),
-            high=np.inf * np.ones(n_obs),
-            dtype=np.float64
+            low=-np.inf,
+            high=np.inf,
+            shape=(n_obs,),
+            dtype=obs_dtype
         )
 
+        # Fixed-precision format of the CF scale factors
+        self.cf_format = f'{{:.{cf_precision}E}}'.format
+
         # Simulation parameters
         self.control_horizon = control_horizon
         self.n_steps = 0
         self.current_tend = 0
+        self.cf_values = []
+
+        # Transition cache (opt-in). States are identified by the deck, the control setup, the executables and the sequence of applied CFs values
+        self.cache = TransitionCache(cache_dir, cache_size) if cache_dir is not None else None
+        with open(self.melcor_model, 'rb') as f:
+            self.initial_state_id = state_key(
+                f.read(), self.control_horizon, self.actuation, ','.join(self.control_cfs),
+                ','.join(tf_id for tf_id, _ in self.control_tfs or []),
+                os.path.abspath(self.melgen_path), os.path.abspath(self.melcor_path))
+        self.state_id = self.initial_state_id
+
+        # Warm-start episode pool, started on the first reset
+        self.pool_size = pool_size
+        self.pool_root = os.path.join(OUTPUT_DIR, pool_dir) if pool_dir is not None \
+            else self.output_dir + '_pool'
+        self.pool_root_owned = pool_dir is None
+        self.pool_dir = None
+        self.pool = None
+        self.pool_worker = None
+        self.pool_stop = threading.Event()
+        self.pool_failures = 0
+
+        # Runtime metrics (opt-in)
+        self.metrics = metrics
+        self.metrics_labels = {'env': os.path.basename(self.output_dir)}
+        if metrics is not None:
+            self.steps_metric = metrics.counter('steps_total', 'Control intervals simulated.')
+            self.resets_metric = metrics.counter('resets_total', 'Episode resets.')
+            self.failures_metric = metrics.counter('failures_total', 'Failed MELGEN/MELCOR executions, EDF reads and pre-resets.')
+            self.cache_hits_metric = metrics.counter('cache_hits_total', 'Transitions restored from the cache.')
+            self.step_time_metric = metrics.histogram('step_seconds', 'Duration of step() calls.')
+            self.melcor_time_metric = metrics.histogram('melcor_seconds', 'Duration of MELCOR executions.')
+            self.reset_time_metric = metrics.histogram('reset_seconds', 'Duration of reset() calls.')
+            self.pool_depth_metric = metrics.gauge('pool_depth', 'Pre-initialized episodes ready in the pool.')
 
     def reset(self, seed: Optional[int] = None, options: Optional[dict] = None):
         """
         Resets the environment to an initial state and returns the first observation.
 
+        If the episode pool is enabled, a pre-initialized episode directory is swapped in instead of running MELGEN.
+
         Args:
             seed (Optional[int]): Seed for random number generation.
             options (Optional[dict]): Additional options for resetting. Not used by default.
@@ -117,38 +244,41 @@ class MelcorEnv(gym.Env):
             Exception: If the MELGEN execution fails.
         """
         super().reset(seed=seed)
+        start = perf_counter()
 
-        if os.path.exists(self.output_dir):
-            # Clean output directory from previous runs
-            self._clean_out_files()
-        else:
-            # Create output folder and copy input file
-            os.makedirs(self.output_dir, exist_ok=True)
-
-        shutil.copy(self.melcor_model, self.melin_path)
+        self.n_steps = 1
+        self.current_tend = self.control_horizon
+        self.cf_values = []
+        self.state_id = self.initial_state_id
+        self.melin_lines = list(self.control_plan.lines)
 
-        self.toolkit = Toolkit(self.melin_path)
-        self.toolkit.remove_comments(overwrite=True)
+        episode_dir = self._get_pooled_episode() if self.pool_size > 0 else None
 
-        # Set initial TEND
-        self.n_steps = 1
-        self._update_time()
+        if episode_dir is not None:
+            self._swap_episode(episode_dir)
+        else:
+            if os.path.exists(self.output_dir):
+                # Clean output directory from previous runs
+                self._clean_out_files()
+            else:
+                # Create output folder
+                os.makedirs(self.output_dir, exist_ok=True)
 
-        # MELGEN execution
-        try:
-            with open(self.melog_path, 'a') as log:
-                subprocess.run([self.melgen_path, self.melin_path],
-                               cwd=self.output_dir, stdout=log, stderr=subprocess.STDOUT)
-        except subprocess.CalledProcessError as e:
-            raise MelgymError(f"MELGEN execution failed: {e}")
+            try:
+                self._init_episode(self.output_dir, use_cache=True, record_usage=True)
+            except MelgymError:
+                self._record_failure('melgen')
+                raise
 
         # Initial state
         info = {'time': 0.0}
         obs = np.zeros(self.observation_space.shape,
                        dtype=self.observation_space.dtype)
 
-        # Add CFs redefinition to MELCOR input
-        self._add_cfs_redefinition()
+        if self.metrics is not None:
+            self.resets_metric.inc(**self.metrics_labels)
+            self.reset_time_metric.observe(perf_counter() - start, **self.metrics_labels)
+            self._update_pool_depth()
 
         return obs, info
 
@@ -157,7 +287,7 @@ class MelcorEnv(gym.Env):
         Executes a step in the MELCOR environment by applying the given action, running a MELCOR simulation during a given control horizon, and retrieving the latest state.
 
         Args:
-            action (np.array): An array of control values (CFs scale factors) to be applied.
+            action (np.array): An array of control values (CFs scale factors, or TF values in 'tf' actuation) to be applied.
 
         Returns:
             tuple:
@@ -168,36 +298,111 @@ class MelcorEnv(gym.Env):
                 - dict: Additional metadata, including:
                     - "TIME" (float): The current simulation time.
                     - Controlled variable names as keys with their respective values.
+                    - "cpu_utilization" (float): Fraction of the assigned cores used by the last MELCOR/MELGEN execution.
+                    - "cached" (bool): Whether the transition was restored from the cache (only if caching is enabled).
 
         Raises:
             Exception: If reset() has not been called before step().
+            Exception: If the MELCOR execution fails or the EDF does not reach the new TEND.
+        """
+        return self._advance([action], action)
+
+    def step_plan(self, actions):
+        """
+        Executes an open-loop plan of several control intervals in a single MELCOR execution.
+        Only available with 'tf' actuation.
+
+        Args:
+            actions (np.array): Array of shape (n_intervals, n_actions), with the action applied during each control horizon.
+
+        Returns:
+            tuple: Same as step(), for the state reached at the end of the plan.
+
+        Raises:
+            Exception: If the environment does not use 'tf' actuation.
+            Exception: If actions do not have shape (n_intervals, n_actions) or there are more intervals than the TFs can hold.
+            Exception: If reset() has not been called before step_plan().
             Exception: If the MELCOR execution fails.
         """
+        if self.actuation != 'tf':
+            raise MelgymError("step_plan() requires 'tf' actuation.")
+        actions = np.asarray(actions)
+        return self._advance(actions, actions)
+
+    def _advance(self, actions, action):
+        """
+        Applies a sequence of actions, runs MELCOR until the end of the last control interval and retrieves the latest state.
+
+        Args:
+            actions (list[np.array]): Action of each control interval.
+            action: Action reported in info.
+
+        Returns:
+            tuple: Observation, reward, termination, truncation and info.
+
+        Raises:
+            MelgymError: If the actions do not have shape (n_intervals, n_actions), or the intervals do not fit the TFs in 'tf' actuation.
+        """
+        actions = np.asarray(actions, dtype=np.float64)
+        if actions.ndim != 2 or actions.shape[1] != len(self.control_cfs):
+            raise MelgymError(
+                f"Actions of shape {actions.shape} given, expected (n_intervals, {len(self.control_cfs)}).")
+        n_intervals = len(actions)
+        if self.actuation == 'tf' and not 1 <= n_intervals <= TF_MAX_PAIRS // 2:
+            raise MelgymError(
+                f"{n_intervals} control intervals given, between 1 and {TF_MAX_PAIRS // 2} are supported in 'tf' actuation.")
+        start = perf_counter()
 
         # Update time
         if self.n_steps > 0:
-            self._update_time()
-            self.n_steps += 1
+            start_time = self.control_horizon * (self.n_steps - 1)
+            self._update_time(n_intervals)
+            self.n_steps += n_intervals
         else:
             raise MelgymError(
                 "Error: reset() has not been called before step()")
 
         # Apply action
-        self._update_cfs(action)
-
-        # MELCOR simulation
+        if self.actuation == 'tf':
+            self.cf_values = self._update_tfs(actions, start_time)
+        else:
+            self.cf_values = self._update_cfs(actions[0])
+        self._write_melin()
+        key = state_key(self.state_id, self.current_tend, *self.cf_values)
+
+        # MELCOR simulation (skipped if the transition is cached)
+        cached = self.cache is not None and self.cache.get(key, self.output_dir)
+        if not cached:
+            try:
+                returncode, wall_time, cpu_time = self._run_process(
+                    [self.melcor_path, 'ow=o', 'i=' + self.melin_path])
+            except (OSError, subprocess.SubprocessError) as e:
+                self._record_failure('melcor')
+                raise MelgymError(f"MELCOR execution failed: {e}")
+            self._record_usage(wall_time, cpu_time)
+            if self.metrics is not None:
+                self.melcor_time_metric.observe(self.last_run_time, **self.metrics_labels)
+            if returncode != 0:
+                self._record_failure('melcor')
+                raise MelgymError(f"MELCOR execution failed with exit code {returncode}")
+
+        # Get observation (the last row of every EDF must have been written at the new TEND)
         try:
-            with open(self.melog_path, 'a') as log:
-                subprocess.call([self.melcor_path, 'ow=o', 'i=' + self.melin_path],
-                                cwd=self.output_dir, stdout=log, stderr=subprocess.STDOUT)
-        except subprocess.CalledProcessError as e:
-            raise MelgymError(f"MELCOR execution failed: {e}")
-
-        # Get observation
-        time, *obs = self._get_last_edf_data()
-
-        info = {'TIME': time, 'action': action}
-        info.update(dict(zip(self.controlled_values, obs)))
+            values = self._get_last_edf_data()
+            time = float(values[0])
+        except (FileNotFoundError, MelgymError):
+            self._record_failure('edf')
+            raise
+        obs = values[1:].astype(self.observation_space.dtype, copy=False)
+
+        if self.cache is not None and not cached:
+            self.cache.put(key, self.output_dir)
+        self.state_id = key
+
+        info = {'TIME': time, 'action': action, 'cpu_utilization': self.last_cpu_utilization}
+        if self.cache is not None:
+            info['cached'] = cached
+        info.update(zip(self.controlled_values, values[1:].tolist()))  # float64, as read from the EDF
 
         # Check termination / truncation
         termination = self._check_termination(obs, info)
@@ -209,7 +414,13 @@ class MelcorEnv(gym.Env):
         # Compute reward
         reward = self._compute_reward(obs, info)
 
-        return np.array(obs, dtype=np.float64), reward, termination, truncation, info
+        if self.metrics is not None:
+            self.steps_metric.inc(n_intervals, **self.metrics_labels)
+            self.step_time_metric.observe(perf_counter() - start, **self.metrics_labels)
+            if cached:
+                self.cache_hits_metric.inc(**self.metrics_labels)
+
+        return obs, reward, termination, truncation, info
 
     def render(self):
         """
@@ -220,163 +431,472 @@ class MelcorEnv(gym.Env):
 
     def close(self):
         """
-        Closes the environment and cleans up resources.
+        Closes the environment and cleans up resources, including the episode pool.
+        Only the MELGEN/MELCOR processes started by this environment are terminated.
+        """
+        self.pool_stop.set()
+
+        with self.processes_lock:
+            processes = list(self.processes)
+        for process in processes:
+            try:
+                process.terminate()
+            except ProcessLookupError:
+                # Already finished
+                pass
+
+        if self.pool_worker is not None:
+            self.pool_worker.join()
+            self.pool_worker = None
+            # Only the private subdirectory is removed, the pool root may be shared
+            shutil.rmtree(self.pool_dir, ignore_errors=True)
+            self.pool_dir = None
+            if self.pool_root_owned:
+                try:
+                    os.rmdir(self.pool_root)
+                except OSError:
+                    pass
+
+    def save_state(self, path: str):
+        """
+        Saves the current episode state, so that it can be resumed with load_state() after a crash.
+
+        The checkpoint is a directory with the env counters, the applied CF values and the EDF offsets (state.json), the patched MELCOR input and the restart file. It is written to a temporary directory and then renamed, so an existing checkpoint is never left half-written. If the process crashes while the previous checkpoint is being replaced, load_state() falls back to the previous one.
+
+        Args:
+            path (str): Path to the checkpoint directory.
 
         Raises:
-            Exception: If the MELCOR or MELGEN processes cannot be terminated.
+            MelgymError: If reset() has not been called before save_state().
         """
+        if self.n_steps == 0:
+            raise MelgymError(
+                "Error: reset() has not been called before save_state()")
+
+        edf_state = {}
+        for package, edf_path, _ in self.edf_columns:
+            if os.path.isfile(edf_path):
+                edf_state[package.file_name] = {
+                    'offset': os.path.getsize(edf_path),
+                    'tail': package.read_tail(edf_path)
+                }
+            else:
+                edf_state[package.file_name] = {'offset': 0, 'tail': ''}
+
+        state = {
+            'melcor_model': self.melcor_model,
+            'initial_state_id': self.initial_state_id,
+            'state_id': self.state_id,
+            'n_steps': self.n_steps,
+            'current_tend': self.current_tend,
+            'cf_values': self.cf_values,
+            'edf': edf_state
+        }
+
+        path = os.path.abspath(path)
+        tmp_path = f'{path}.tmp-{uuid.uuid4().hex[:8]}'
+        os.makedirs(tmp_path)
         try:
-            subprocess.run(["pkill", "-f", self.melcor_path], check=False)
-            subprocess.run(["pkill", "-f", self.melgen_path], check=False)
-        except MelgymWarning as e:
-            print(f"Warning: Failed to terminate MELCOR/MELGEN processes: {e}")
-
-    def _clean_out_files(self):
-        """
-        Cleans the output directory where past simulation files are stored.
+            for file in CHECKPOINT_FILES[1:]:
+                shutil.copy2(os.path.join(self.output_dir, file),
+                             os.path.join(tmp_path, file))
+            with open(os.path.join(tmp_path, 'state.json'), 'w') as f:
+                json.dump(state, f)
+            for file in os.listdir(tmp_path):
+                self._fsync(os.path.join(tmp_path, file))
+            self._fsync(tmp_path)
+
+            # Previous checkpoints, kept until the new one is in place
+            old_paths = glob.glob(glob.escape(path) + '.old-*')
+            if os.path.exists(path):
+                old_path = f'{path}.old-{uuid.uuid4().hex[:8]}'
+                os.rename(path, old_path)
+                old_paths.append(old_path)
+            os.rename(tmp_path, path)
+            self._fsync(os.path.dirname(path))
+
+            for old_path in old_paths:
+                shutil.rmtree(old_path, ignore_errors=True)
+        except OSError as e:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise MelgymError(f"Failed to save state to {path}: {e}")
+
+    def load_state(self, path: str):
         """
-        for file in os.listdir(self.output_dir):
-            os.remove(os.path.join(self.output_dir, file))
+        Restores an episode state saved with save_state(). The next step() continues the simulation from the saved restart file.
 
-    def _update_time(self):
-        """
-        Updates the TEND value in the input file based on the specified control horizon.
+        EDF files in the output directory are truncated to the saved offsets. If they are missing or shorter, they are rewritten with the last saved row.
+        If the checkpoint is missing or incomplete because save_state() crashed while replacing it, the previous checkpoint is loaded.
+        The checkpoint is fully validated before the output directory is modified.
+
+        Args:
+            path (str): Path to the checkpoint directory.
 
         Raises:
-            ValueError: If no TEND register is found in the input file.
-            FileNotFoundError: If the input file is not found.
+            FileNotFoundError: If the checkpoint is not found.
+            MelgymError: If the checkpoint is incomplete or corrupted, or was saved from a different MELCOR model, control setup or executables.
         """
+        def is_complete(checkpoint):
+            return all(os.path.isfile(os.path.join(checkpoint, file)) for file in CHECKPOINT_FILES)
 
-        new_tend = str(self.control_horizon * self.n_steps)
+        path = os.path.abspath(path)
+        if not is_complete(path):
+            old_paths = [old_path for old_path in glob.glob(glob.escape(path) + '.old-*')
+                         if is_complete(old_path)]
+            if old_paths:
+                path = max(old_paths, key=os.path.getmtime)
+                warnings.warn(f"Checkpoint not found, loading the previous checkpoint {path}.", MelgymWarning)
+
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"Checkpoint {path} not found.")
+
+        missing = [file for file in CHECKPOINT_FILES if not os.path.isfile(os.path.join(path, file))]
+        if missing:
+            raise MelgymError(f"Checkpoint {path} is incomplete, missing {missing}.")
 
         try:
-            with open(self.melin_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
+            with open(os.path.join(path, 'state.json'), 'r') as f:
+                state = json.load(f)
+        except json.JSONDecodeError as e:
+            raise MelgymError(f"Checkpoint {path} is corrupted: {e}")
 
-            for i, line in enumerate(lines):
-                if 'TEND' in line:
-                    lines[i] = f"TEND {new_tend}\n"
-                    self.current_tend = int(new_tend)
-                    break
+        missing = [key for key in ('initial_state_id', 'state_id', 'n_steps', 'current_tend', 'cf_values', 'edf')
+                   if key not in state]
+        if missing:
+            raise MelgymError(f"Checkpoint {path} is corrupted, missing {missing} in state.json.")
+
+        if state['initial_state_id'] != self.initial_state_id:
+            raise MelgymError(
+                f"Checkpoint {path} does not match the MELCOR model {self.melcor_model}, the control setup or the executables.")
+
+        # Clean output directory, keeping EDF files to preserve their history
+        edf_files = {package.file_name for package in self.edf_schema.packages}
+        if os.path.exists(self.output_dir):
+            for file in os.listdir(self.output_dir):
+                if file not in edf_files:
+                    os.remove(os.path.join(self.output_dir, file))
+        else:
+            os.makedirs(self.output_dir, exist_ok=True)
+
+        for file in CHECKPOINT_FILES[1:]:
+            shutil.copy2(os.path.join(path, file),
+                         os.path.join(self.output_dir, file))
+
+        for file_name, edf_state in state['edf'].items():
+            edf_path = os.path.join(self.output_dir, file_name)
+            if os.path.isfile(edf_path) and os.path.getsize(edf_path) >= edf_state['offset']:
+                os.truncate(edf_path, edf_state['offset'])
             else:
-                raise ValueError(f"TEND not specified in {self.melin_path}")
+                with open(edf_path, 'w') as f:
+                    f.write(edf_state['tail'])
 
-            with open(self.melin_path, 'w', encoding='utf-8') as f:
-                f.writelines(lines)
+        self.melin_lines = list(self.control_plan.lines)
+        self.state_id = state['state_id']
+        self.n_steps = state['n_steps']
+        self.current_tend = state['current_tend']
+        self.cf_values = state['cf_values']
 
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Input file {self.melin_path} not found.")
+    @staticmethod
+    def _fsync(path: str):
+        """
+        Flushes a file or directory to disk.
 
-    def _add_cfs_redefinition(self):
+        Args:
+            path (str): Path to the file or directory.
+        """
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def cpu_utilization(self) -> float:
+        """
+        Returns the average utilization of the assigned cores by the MELGEN/MELCOR processes of the environment episodes (pre-resets of the pool worker are not included).
+
+        Returns:
+            float: CPU time divided by the execution time of the processes and the number of assigned cores.
+        """
+        if self.run_time == 0:
+            return 0.0
+        return self.cpu_time / (self.run_time * self.n_cpus)
+
+    def _run_process(self, args: list[str], cwd: Optional[str] = None) -> tuple[int, float, float]:
+        """
+        Runs a MELGEN/MELCOR process with the configured affinity, niceness and thread limits.
+        It may be called from the pool worker, so it does not update the environment state (see _record_usage()).
+
+        Args:
+            args (list[str]): Command line of the process.
+            cwd (Optional[str]): Working directory, where MELOG is written. If None, the output directory is used.
+
+        Returns:
+            tuple[int, float, float]: Exit code, execution (wall) time and CPU time of the process.
+        """
+        cwd = cwd if cwd is not None else self.output_dir
+        start = perf_counter()
+        with open(os.path.join(cwd, 'MELOG'), 'a') as log:
+            # Started already pinned and reniced, so that every thread of the process inherits the placement
+            with spawn_affinity(self.cpus):
+                process = subprocess.Popen(self.process_prefix + args, cwd=cwd, stdout=log,
+                                           stderr=subprocess.STDOUT, env=self.process_env)
+            with self.processes_lock:
+                self.processes.add(process)
+            try:
+                if hasattr(os, 'wait4'):
+                    try:
+                        _, status, usage = os.wait4(process.pid, 0)
+                        process.returncode = os.waitstatus_to_exitcode(status)
+                        cpu_time = usage.ru_utime + usage.ru_stime
+                    except ChildProcessError:
+                        # Already reaped by close()
+                        process.wait()
+                        cpu_time = 0.0
+                else:
+                    process.wait()
+                    cpu_time = 0.0
+            finally:
+                with self.processes_lock:
+                    self.processes.discard(process)
+        wall_time = perf_counter() - start
+
+        return process.returncode, wall_time, cpu_time
+
+    def _record_usage(self, wall_time: float, cpu_time: float):
+        """
+        Records the CPU usage of a MELGEN/MELCOR execution of the current episode.
+
+        Args:
+            wall_time (float): Execution time of the process.
+            cpu_time (float): CPU time of the process.
         """
-        Includes the definitions of the CFs to be overwritten in the MELCOR input, inserting them after "*EOR* MELCOR".
-        If the marker is not found, the block is inserted before the last line.
+        self.cpu_time += cpu_time
+        self.run_time += wall_time
+        self.last_cpu_utilization = cpu_time / (wall_time * self.n_cpus) if wall_time > 0 else 0.0
+        self.last_run_time = wall_time
+
+    def _init_episode(self, episode_dir: str, use_cache: bool = False, check: bool = False,
+                      record_usage: bool = False):
+        """
+        Initializes an episode directory: writes the compiled input file (without comments, with the initial TEND and the redefinition block) and runs MELGEN.
+
+        Args:
+            episode_dir (str): Existing (empty) episode directory.
+            use_cache (bool): Whether to look up and store the MELGEN output in the transition cache.
+            check (bool): Whether to raise an error if MELGEN exits with a non-zero code.
+            record_usage (bool): Whether to record the CPU usage of MELGEN (only for the current episode, not for the pool worker).
 
         Raises:
-            FileNotFoundError: If the input file is not found.
+            MelgymError: If the MELGEN execution fails.
         """
-        # Get the headlines of the controlled CFs
-        cf_headlines = [str(cf).split('\n')[0]
-                        for cf in self.toolkit.get_cf_list()
-                        if cf.get_id() in self.control_cfs]
+        with open(os.path.join(episode_dir, 'MELIN'), 'w', encoding='utf-8') as f:
+            f.writelines(self.control_plan.lines)
 
-        try:
-            with open(self.melin_path, 'r') as f:
-                lines = f.readlines()
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Input file {self.melin_path} not found.")
-
-        # Search for insertion line
-        insert_index = None
-        for i, line in enumerate(lines):
-            if "*EOR* MELCOR" in line:
-                insert_index = i + 1
-                break
-        if insert_index is None:
-            insert_index = len(lines) - 1
-
-        # Add CFs redefinition
-        block = f"\n{'*' * 30} CONTROLLERS {'*' * 30}\n" + \
-            '\n'.join(cf_headlines) + '\n' + f"{'*' * 73}\n"
-        new_lines = lines[:insert_index] + [block] + lines[insert_index:]
-
-        with open(self.melin_path, 'w') as f:
-            f.write(''.join(new_lines))
+        # MELGEN execution
+        use_cache = use_cache and self.cache is not None
+        if not (use_cache and self.cache.get(self.initial_state_id, episode_dir)):
+            try:
+                returncode, wall_time, cpu_time = self._run_process([self.melgen_path, 'MELIN'], cwd=episode_dir)
+            except (OSError, subprocess.SubprocessError) as e:
+                raise MelgymError(f"MELGEN execution failed: {e}")
+            if record_usage:
+                self._record_usage(wall_time, cpu_time)
+            if returncode != 0:
+                if check:
+                    raise MelgymError(f"MELGEN execution failed with exit code {returncode}")
+                self._record_failure('melgen')
+            elif use_cache:
+                self.cache.put(self.initial_state_id, episode_dir)
+
+    def _fill_pool(self):
+        """
+        Background worker that keeps the episode pool full.
+        Failed pre-resets are queued as exceptions, so that they are reported by reset().
+        """
+        while not self.pool_stop.is_set():
+            episode_dir = os.path.join(self.pool_dir, f'episode_{uuid.uuid4().hex[:8]}')
+            try:
+                os.makedirs(episode_dir)
+                self._init_episode(episode_dir, check=True)
+                item = episode_dir
+            except Exception as e:
+                shutil.rmtree(episode_dir, ignore_errors=True)
+                item = e
+
+            while not self.pool_stop.is_set():
+                try:
+                    self.pool.put(item, timeout=0.5)
+                    self._update_pool_depth()
+                    break
+                except queue.Full:
+                    continue
+
+    def _get_pooled_episode(self) -> Optional[str]:
+        """
+        Takes a pre-initialized episode directory from the pool, starting the background worker if needed.
+
+        Returns:
+            Optional[str]: Path to the episode directory, or None if its pre-reset failed.
+        """
+        if self.pool_worker is None:
+            os.makedirs(self.pool_root, exist_ok=True)
+            self.pool_dir = tempfile.mkdtemp(
+                prefix=os.path.basename(self.output_dir) + '_', dir=self.pool_root)
+            self.pool = queue.Queue(maxsize=self.pool_size)
+            self.pool_stop.clear()
+            self.pool_worker = threading.Thread(target=self._fill_pool, daemon=True)
+            self.pool_worker.start()
+
+        item = self.pool.get()
+        if isinstance(item, Exception):
+            self.pool_failures += 1
+            self._record_failure('pre_reset')
+            warnings.warn(
+                f"Pre-reset failed ({self.pool_failures} so far), resetting synchronously: {item}", MelgymWarning)
+            return None
+        return item
+
+    def _swap_episode(self, episode_dir: str):
+        """
+        Replaces the output directory with a pre-initialized episode directory.
+        The previous output directory is removed in the background.
+
+        Args:
+            episode_dir (str): Path to the episode directory.
+        """
+        if os.path.exists(self.output_dir):
+            old_dir = os.path.join(self.pool_dir, f'.old_{uuid.uuid4().hex[:8]}')
+            shutil.move(self.output_dir, old_dir)
+            threading.Thread(target=shutil.rmtree, args=(old_dir,),
+                             kwargs={'ignore_errors': True}, daemon=True).start()
+        shutil.move(episode_dir, self.output_dir)
+
+    def _update_pool_depth(self):
+        """
+        Sets the pool depth in the runtime metrics, if enabled.
+        """
+        if self.metrics is not None and self.pool is not None:
+            self.pool_depth_metric.set(self.pool.qsize(), **self.metrics_labels)
+
+    def _record_failure(self, kind: str):
+        """
+        Counts a failure in the runtime metrics, if enabled.
+
+        Args:
+            kind (str): Failure kind ('melgen', 'melcor', 'edf' or 'pre_reset').
+        """
+        if self.metrics is not None:
+            self.failures_metric.inc(kind=kind, **self.metrics_labels)
+
+    def _clean_out_files(self):
+        """
+        Cleans the output directory where past simulation files are stored.
+        """
+        for file in os.listdir(self.output_dir):
+            os.remove(os.path.join(self.output_dir, file))
+
+    def _update_time(self, n_intervals: int = 1):
+        """
+        Updates the TEND record of the MELCOR input based on the specified control horizon.
+
+        Args:
+            n_intervals (int): Number of control intervals simulated by the next MELCOR execution.
+        """
+        new_tend = self.control_horizon * (self.n_steps + n_intervals - 1)
+        self.melin_lines[self.control_plan.tend_index] = f"TEND {new_tend}\n"
+        self.current_tend = new_tend
 
     def _update_cfs(self, action):
         """
         Updates the scale factor of every controlled CF in the MELCOR input according to a given action.
+        Action values are assigned in control_cfs order.
 
         Args:
             action (np.array): New scale factors to assign to the CFs.
 
+        Returns:
+            list[str]: Scale factors written to the MELCOR input, in order.
+
         Raises:
-            Exception: If the marker "*EOR* MELCOR" is not found.
-            FileNotFoundError: If the input file is not found.
+            MelgymError: If the action size does not match the number of controlled CFs.
         """
-        try:
-            with open(self.melin_path, 'r') as f:
-                lines = f.readlines()
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Input file {self.melin_path} not found.")
+        # Python floats avoid str() on NumPy scalars and keep the full action precision
+        cf_values = [self.cf_format(value)
+                     for value in np.asarray(action, dtype=np.float64).ravel().tolist()]
 
-        # Search for "*EOR* MELCOR" line
-        try:
-            marker_index = next(i for i, line in enumerate(
-                lines) if "*EOR* MELCOR" in line)
-        except StopIteration:
+        plan = self.control_plan
+        if len(cf_values) != len(plan.cf_indices):
             raise MelgymError(
-                "Marker '*EOR* MELCOR' not found in the input file.")
+                f"{len(cf_values)} action values given for {len(plan.cf_indices)} controlled CFs.")
 
-        action_idx = 0
-        num_actions = len(action)
+        for index, tokens, value in zip(plan.cf_indices, plan.cf_tokens, cf_values):
+            self.melin_lines[index] = ' '.join(tokens[:4] + [value] + tokens[5:]) + '\n'
 
-        # Update scale factors in CFs after marker
-        for i in range(marker_index + 1, len(lines)):
-            tokens = lines[i].split()
-            if not tokens or len(tokens) < 5 or not tokens[0].endswith('00'):
-                continue
+        return cf_values
 
-            cf_id = tokens[0][:-2]
+    def _update_tfs(self, actions, start_time: float):
+        """
+        Rewrites the tabular functions of the controlled CFs in the MELCOR input, with one piecewise-constant segment per control interval.
 
-            if cf_id in self.control_cfs and action_idx < num_actions:
-                tokens[4] = str(action[action_idx])
-                action_idx += 1
-                lines[i] = ' '.join(tokens) + '\n'
+        Args:
+            actions (np.array): Action of each control interval, of shape (n_intervals, n_actions).
+            start_time (float): Simulation time at which the first interval starts.
 
-        with open(self.melin_path, 'w') as f:
-            f.writelines(lines)
+        Returns:
+            list[str]: TF values written to the MELCOR input, in order.
+        """
+        values = np.asarray(actions, dtype=np.float64).reshape(len(actions), -1)
+        horizon = self.control_horizon
+        end_time = start_time + horizon * len(values)
+
+        # Each segment ends just before the next one starts
+        epsilon = horizon * TF_SEGMENT_GAP
+        records, tf_values = [], []
+        for i, (tf_id, header) in enumerate(self.control_tfs):
+            points = []
+            for j, value in enumerate(values[:, i].tolist()):
+                segment_start = start_time + horizon * j
+                segment_end = segment_start + horizon
+                points.append((segment_start, value))
+                points.append((segment_end if segment_end >= end_time else segment_end - epsilon, value))
+                tf_values.append(self.cf_format(value))
+            records.extend(tf_records(tf_id, header, points, self.cf_format))
+
+        self.melin_lines[self.control_plan.block_index] = ''.join(records)
+
+        return tf_values
+
+    def _write_melin(self):
+        """
+        Writes the current MELCOR input (TEND and redefinition block updated) to the output directory.
+        """
+        with open(self.melin_path, 'w', encoding='utf-8') as f:
+            f.writelines(self.melin_lines)
 
     def _get_last_edf_data(self):
         """
-        Reads the last recorded values from the EDF file.
+        Reads the last recorded values from the EDF files.
+
+        Values are accessed by the column positions indexed in the EDF schema. The last row of every package must have been written at the current TEND, so that stale rows are never returned.
 
         Returns:
-            np.array: An array containing the last recorded values as np.float64.
+            np.array: An array containing TIME followed by the last recorded values of the controlled variables as np.float64.
 
         Raises:
-            FileNotFoundError: If the EDF file is not found.
-            ValueError: If the file cannot be parsed correctly.
+            FileNotFoundError: If an EDF file is not found.
+            MelgymError: If the last row of an EDF file is malformed, partially flushed or not written at the current TEND.
         """
-        try:
-            with open(self.edf_path, 'rb') as edf:
-                edf.seek(0, os.SEEK_END)
-                file_size = edf.tell()
-                buffer_size = min(4096, file_size)
-                edf.seek(-buffer_size, os.SEEK_END)
-
-                # Leer los últimos valores
-                raw_data = edf.read().decode(errors='ignore').split()
-                values = raw_data[-(len(self.controlled_values) + 1):]
-
-                # Convertir a NumPy array con dtype float64
-                return np.fromstring(" ".join(values), sep=" ", dtype=np.float64)
-
-        except FileNotFoundError:
-            raise FileNotFoundError(f"EDF file {self.edf_path} not found.")
-        except ValueError:
-            raise ValueError(
-                f"Failed to parse numerical values from EDF file: {self.edf_path}")
+        values = []
+        for package, path, columns in self.edf_columns:
+            row = package.read_last_row(path)
+            if abs(row[0] - self.current_tend) > self.control_horizon * EDF_TIME_TOLERANCE:
+                raise MelgymError(
+                    f"Last row of EDF file {path} written at TIME={row[0]}, expected {self.current_tend}.")
+            if not values:
+                values.append(row[:1])
+            values.append(row[columns])
+
+        return np.concatenate(values)
 
     def _compute_reward(self, obs, info):
         """
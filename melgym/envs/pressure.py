@@ -27,6 +27,7 @@ class PressureEnv(MelcorEnv):
         max_deviation (float): Maximum deviation from setpoints for truncation.
         render_mode (str): Render mode. Default is None.
         logging (bool): Logging option. Default is False.
+        **kwargs: Additional MelcorEnv arguments (control_horizon, output_dir, cache_dir, dtypes, etc.).
     """
     metadata = {
         "render_modes": ['human'],
@@ -34,9 +35,9 @@ class PressureEnv(MelcorEnv):
     }
 
     def __init__(self, melcor_model, control_cfs, min_action_value, max_action_value,
-                 setpoints, max_episode_len, max_deviation=None, render_mode=None, logging=False):
+                 setpoints, max_episode_len, max_deviation=None, render_mode=None, logging=False, **kwargs):
         super().__init__(melcor_model=melcor_model, control_cfs=control_cfs,
-                         min_action_value=min_action_value, max_action_value=max_action_value)
+                         min_action_value=min_action_value, max_action_value=max_action_value, **kwargs)
 
         self.setpoints = setpoints
         self.max_deviation = max_deviation
@@ -66,7 +67,7 @@ class PressureEnv(MelcorEnv):
         self.time_data.clear()
         self.obs_data.clear()
 
-        obs = np.array(self.setpoints)
+        obs = np.array(self.setpoints, dtype=self.observation_space.dtype)
 
         if self.logging:
             self._write_csv_log(
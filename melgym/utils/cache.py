@@ -0,0 +1,188 @@
+"""
+On-disk cache of deterministic MELCOR transitions.
+
+Each entry stores the output files of a simulation (restart, EDF, etc.) under a key identifying the simulated state, so that the same transition can be restored instead of being simulated again.
+"""
+
+import hashlib
+import os
+import shutil
+import warnings
+
+from collections import OrderedDict
+
+from .exceptions import MelgymWarning
+
+CACHE_EXCLUDED_FILES = ('MELIN', 'MELOG')
+RESCAN_INTERVAL = 100  # Stores between rescans of the cache directory
+
+
+def state_key(*parts) -> str:
+    """
+    Hashes a sequence of values into a cache key.
+
+    Args:
+        *parts: Values identifying a state (previous key, CF values, TEND, etc.).
+
+    Returns:
+        str: Hex digest of the values.
+    """
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class TransitionCache:
+    """
+    Size-bounded LRU cache of MELCOR output directories.
+
+    Entries are stored as subdirectories of the cache directory. Several environments can share the same cache directory: recency is tracked by the modification time of the entries, and the directory is rescanned before evicting, so that the maximum size applies to the whole directory.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int):
+        """
+        Initializes the transition cache, indexing the entries already stored in the cache directory.
+
+        Args:
+            cache_dir (str): Directory where entries are stored.
+            max_size (int): Maximum total size of the entries, in bytes.
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Key -> entry size, from least to most recently used
+        self.entries = OrderedDict()
+        self.size = 0
+        self._scan()
+
+    def get(self, key: str, output_dir: str) -> bool:
+        """
+        Restores the files of a cached transition into the output directory.
+
+        Args:
+            key (str): Transition key.
+            output_dir (str): Directory where the files are restored.
+
+        Returns:
+            bool: True if the transition was cached, False otherwise.
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        copied = []
+        try:
+            # Copy every file first, so that a partially evicted entry leaves the output directory untouched
+            for file in os.listdir(entry_dir):
+                shutil.copy2(os.path.join(entry_dir, file),
+                             os.path.join(output_dir, file + '.cached'))
+                copied.append(file)
+            os.utime(entry_dir)
+        except FileNotFoundError:
+            # Not cached, or evicted by another environment
+            for file in copied:
+                os.remove(os.path.join(output_dir, file + '.cached'))
+            self.size -= self.entries.pop(key, 0)
+            self.misses += 1
+            return False
+
+        for file in copied:
+            os.replace(os.path.join(output_dir, file + '.cached'),
+                       os.path.join(output_dir, file))
+
+        if key not in self.entries:
+            self.entries[key] = self._dir_size(entry_dir)
+            self.size += self.entries[key]
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return True
+
+    def put(self, key: str, output_dir: str):
+        """
+        Stores the output files of a simulated transition.
+
+        Args:
+            key (str): Transition key.
+            output_dir (str): Directory with the simulation output files.
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        if os.path.isdir(entry_dir):
+            return
+
+        tmp_dir = os.path.join(self.cache_dir, f'.{key}.{os.getpid()}')
+        try:
+            shutil.copytree(output_dir, tmp_dir,
+                            ignore=shutil.ignore_patterns(*CACHE_EXCLUDED_FILES))
+            # copytree keeps the modification time of the output directory, used as recency
+            os.utime(tmp_dir)
+            os.rename(tmp_dir, entry_dir)
+        except OSError as e:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not os.path.isdir(entry_dir):
+                warnings.warn(f"Failed to cache transition {key}: {e}", MelgymWarning)
+            return
+
+        self.entries[key] = self._dir_size(entry_dir)
+        self.size += self.entries[key]
+        self._evict()
+
+    def stats(self) -> dict:
+        """
+        Returns the cache statistics.
+
+        Returns:
+            dict: Number of hits, misses, evictions and entries, and total size in bytes.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'size': self.size
+        }
+
+    def _scan(self):
+        """
+        Indexes the entries stored in the cache directory, including those added by other environments.
+        """
+        stored = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_dir() and not entry.name.startswith('.'):
+                try:
+                    stored.append((entry.stat().st_mtime, entry.name, self._dir_size(entry.path)))
+                except FileNotFoundError:
+                    # Evicted by another environment
+                    continue
+
+        self.entries = OrderedDict((key, size) for _, key, size in sorted(stored))
+        self.size = sum(self.entries.values())
+        self.puts_since_scan = 0
+
+    def _evict(self):
+        """
+        Removes the least recently used entries until the cache directory fits its maximum size.
+        The most recent entry is always kept.
+
+        The directory is only rescanned (to include the entries of other environments) when the tracked size exceeds the maximum size, or every RESCAN_INTERVAL stores.
+        """
+        self.puts_since_scan += 1
+        if self.size <= self.max_size and self.puts_since_scan < RESCAN_INTERVAL:
+            return
+
+        self._scan()
+        while self.size > self.max_size and len(self.entries) > 1:
+            key, size = self.entries.popitem(last=False)
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            self.size -= size
+            self.evictions += 1
+
+    @staticmethod
+    def _dir_size(path: str) -> int:
+        """
+        Returns the total size of the files in a directory.
+        """
+        return sum(e.stat().st_size for e in os.scandir(path) if e.is_file())
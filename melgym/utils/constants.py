@@ -6,6 +6,7 @@ Constants used by MELGYM.
 - `EXEC_DIR`: The directory where executable files are stored.
 - `MELGEN_PATH`: The path to the MELGEN executable.
 - `MELCOR_PATH`: The path to the MELCOR executable.
+- `RESTART_FILE`: The name of the restart file written by MELGEN/MELCOR.
 """
 
 import os
@@ -17,3 +18,5 @@ OUTPUT_DIR = os.path.join(BASE_DIR, "out")
 EXEC_DIR = os.path.join(BASE_DIR, "exec")
 MELGEN_PATH = os.path.join(EXEC_DIR, "MELGEN")
 MELCOR_PATH = os.path.join(EXEC_DIR, "MELCOR")
+
+RESTART_FILE = "MELRST"
@@ -0,0 +1,168 @@
+"""
+CPU placement of MELCOR/MELGEN processes.
+
+Helpers to split the available cores among environments (or sweep runs), and to pin, renice and limit the threads of the processes they spawn. On platforms without CPU affinity support, processes are simply left unpinned.
+"""
+
+import os
+import shutil
+import warnings
+
+from contextlib import contextmanager
+from typing import Optional
+
+from .exceptions import MelgymWarning
+
+THREAD_ENV_VARS = ['OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS']
+
+
+def available_cpus() -> list[int]:
+    """
+    Returns the CPU cores available to the current process.
+
+    Returns:
+        list[int]: Sorted list of core ids.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def cpu_slots(cpus_per_slot: int = 1, n_cpus: Optional[int] = None) -> list[list[int]]:
+    """
+    Splits the available cores into disjoint slots.
+
+    Args:
+        cpus_per_slot (int): Number of cores of each slot.
+        n_cpus (Optional[int]): Maximum number of cores to use. If None, every available core is used.
+
+    Returns:
+        list[list[int]]: Core ids of each slot. At least one slot is always returned.
+    """
+    cpus = available_cpus()
+    if n_cpus is not None:
+        cpus = cpus[:n_cpus]
+
+    if len(cpus) < cpus_per_slot:
+        warnings.warn(
+            f"Only {len(cpus)} cores available for slots of {cpus_per_slot} cores.", MelgymWarning)
+        return [cpus]
+
+    n_slots = len(cpus) // cpus_per_slot
+    return [cpus[i * cpus_per_slot:(i + 1) * cpus_per_slot] for i in range(n_slots)]
+
+
+def env_cpu_sets(n_envs: int, cpus_per_env: int = 1, reserved: int = 1) -> list[list[int]]:
+    """
+    Assigns a set of cores to each environment of a pool.
+
+    The first ``reserved`` cores are left to the learner. If there are fewer free cores than requested, environments share them in round-robin order.
+
+    Args:
+        n_envs (int): Number of environments.
+        cpus_per_env (int): Number of cores of each environment.
+        reserved (int): Number of cores reserved for the learner process.
+
+    Returns:
+        list[list[int]]: Core ids of each environment.
+    """
+    cpus = available_cpus()
+    free = cpus[reserved:] if len(cpus) > reserved else cpus
+
+    if len(free) < n_envs * cpus_per_env:
+        warnings.warn(
+            f"{n_envs} environments of {cpus_per_env} cores share {len(free)} free cores.", MelgymWarning)
+
+    return [[free[(i * cpus_per_env + j) % len(free)] for j in range(cpus_per_env)]
+            for i in range(n_envs)]
+
+
+def thread_vars(n_threads: int) -> dict[str, str]:
+    """
+    Returns the environment variables limiting the threads of a process.
+
+    Args:
+        n_threads (int): Maximum number of threads.
+
+    Returns:
+        dict[str, str]: Thread-count environment variables.
+    """
+    return {var: str(n_threads) for var in THREAD_ENV_VARS}
+
+
+def pin_process(cpus: Optional[list[int]] = None, niceness: int = 0):
+    """
+    Sets the CPU affinity and niceness of the calling process (inherited by its children).
+
+    Args:
+        cpus (Optional[list[int]]): Core ids. If None, affinity is not changed.
+        niceness (int): Niceness increment.
+    """
+    if cpus and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cpus)
+    if niceness and hasattr(os, 'nice'):
+        os.nice(niceness)
+
+
+@contextmanager
+def spawn_affinity(cpus: Optional[list[int]] = None):
+    """
+    Pins the calling thread while child processes are spawned, so that they start (and create their threads) already pinned.
+
+    On Linux, affinity is per thread: other threads of the current process are not affected, and the previous affinity is restored on exit. If the affinity cannot be set, processes are spawned unpinned.
+
+    Args:
+        cpus (Optional[list[int]]): Core ids. If None, affinity is not changed.
+    """
+    previous = None
+    if cpus and hasattr(os, 'sched_setaffinity'):
+        try:
+            previous = os.sched_getaffinity(0)
+            os.sched_setaffinity(0, cpus)
+        except OSError as e:
+            warnings.warn(f"Failed to pin processes to cores {cpus}: {e}", MelgymWarning)
+            previous = None
+    try:
+        yield
+    finally:
+        if previous is not None:
+            os.sched_setaffinity(0, previous)
+
+
+def nice_command(niceness: int = 0) -> list[str]:
+    """
+    Returns the command prefix that starts a process with a niceness increment.
+
+    Args:
+        niceness (int): Niceness increment.
+
+    Returns:
+        list[str]: ``nice`` command prefix, or an empty list if there is nothing to set or ``nice`` is not available.
+    """
+    if not niceness:
+        return []
+    nice_path = shutil.which('nice')
+    if nice_path is None:
+        warnings.warn(f"'nice' not found, niceness {niceness} is not applied.", MelgymWarning)
+        return []
+    return [nice_path, '-n', str(niceness)]
+
+
+def valid_cpus(cpus: Optional[list[int]] = None) -> Optional[list[int]]:
+    """
+    Discards the cores not available to the current process.
+
+    Args:
+        cpus (Optional[list[int]]): Core ids.
+
+    Returns:
+        Optional[list[int]]: Available core ids, or None if no core is available or given.
+    """
+    if not cpus:
+        return None
+
+    valid = sorted(set(cpus) & set(available_cpus()))
+    if len(valid) < len(cpus):
+        warnings.warn(
+            f"Cores {sorted(set(cpus) - set(valid))} not available. Using {valid or 'every core'}.", MelgymWarning)
+    return valid or None
@@ -0,0 +1,168 @@
+"""
+MELCOR deck analysis and compiled control plan.
+
+The MELCOR model is analyzed once, when the environment is created:
+
+- The ``*EOR* MELCOR`` marker and the ``TEND`` record of the MELCOR input must be present.
+- Every controlled CF must have a ``CFnnn00`` record with a scale factor.
+
+The result is a ControlPlan: the episode input file (comments removed, redefinition block included) and the position of every record that is rewritten between restarts.
+
+Comment handling and record tokenizing are shared by every deck parser (EDF schema, TF lookup and control plan): comments start with ``*`` or ``!`` and run to the end of the line.
+"""
+
+import re
+
+from .exceptions import MelgymError
+
+EOR_MELCOR = '*EOR* MELCOR'
+COMMENT_REGEX = re.compile(r'[*!]')
+
+
+def read_deck(path: str) -> list[str]:
+    """
+    Reads the lines of a MELCOR input file.
+
+    Args:
+        path (str): Path to the MELCOR input file.
+
+    Returns:
+        list[str]: Input lines.
+
+    Raises:
+        FileNotFoundError: If the input file is not found.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.readlines()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Input file {path} not found.")
+
+
+def record_fields(line: str) -> list[str]:
+    """
+    Splits an input line into the fields of its record, without comments.
+
+    Args:
+        line (str): Input line.
+
+    Returns:
+        list[str]: Record fields (empty for comment and blank lines).
+    """
+    return COMMENT_REGEX.split(line, maxsplit=1)[0].split()
+
+
+def strip_comments(lines: list[str]) -> list[str]:
+    """
+    Removes comments from MELCOR input lines. Comment lines are dropped and inline comments are truncated. Lines with "*EOR*" markers are kept.
+
+    Args:
+        lines (list[str]): Input lines.
+
+    Returns:
+        list[str]: Lines without comments.
+    """
+    stripped = []
+    for line in lines:
+        if '*EOR*' in line:
+            stripped.append(line)
+        elif line.startswith(('*', '!')):
+            continue
+        elif COMMENT_REGEX.search(line):
+            stripped.append(COMMENT_REGEX.split(line, maxsplit=1)[0] + '\n')
+        else:
+            stripped.append(line)
+    return stripped
+
+
+class ControlPlan:
+    """
+    Compiled episode input file and locations of the records rewritten between restarts.
+
+    The redefinition block is inserted after "*EOR* MELCOR". In TF actuation, its records are kept as a single (multi-line) entry of ``lines``, so the position of the rest of records does not depend on the number of breakpoints.
+    """
+
+    def __init__(self, lines: list[str], tend_index: int, block_index: int,
+                 cf_indices: list[int], cf_tokens: list[list[str]]):
+        """
+        Initializes the control plan.
+
+        Args:
+            lines (list[str]): Episode input file (the TF records are kept as a single entry).
+            tend_index (int): Position of the TEND record.
+            block_index (int): Position of the first record of the redefinition block.
+            cf_indices (list[int]): Position of the CFnnn00 redefinition of each controlled CF, in control_cfs order (empty in TF actuation).
+            cf_tokens (list[list[str]]): Fields of each CFnnn00 redefinition, in control_cfs order.
+        """
+        self.lines = lines
+        self.tend_index = tend_index
+        self.block_index = block_index
+        self.cf_indices = cf_indices
+        self.cf_tokens = cf_tokens
+
+    @classmethod
+    def from_deck(cls, path: str, control_cfs: list[str], tend: int, title: str,
+                  redefine_cfs: bool = True) -> 'ControlPlan':
+        """
+        Validates a MELCOR input file and compiles its control plan.
+
+        Args:
+            path (str): Path to the MELCOR input file.
+            control_cfs (list[str]): Controlled CFs (e.g. 'CF007').
+            tend (int): Initial TEND value.
+            title (str): Title of the redefinition block.
+            redefine_cfs (bool): Whether the CFnnn00 records of the controlled CFs are included in the redefinition block.
+
+        Returns:
+            ControlPlan: The compiled control plan.
+
+        Raises:
+            FileNotFoundError: If the input file is not found.
+            MelgymError: If the "*EOR* MELCOR" marker or the TEND record are missing, or a controlled CF is not defined.
+        """
+        lines = strip_comments(read_deck(path))
+
+        try:
+            marker_index = next(i for i, line in enumerate(lines) if EOR_MELCOR in line)
+        except StopIteration:
+            raise MelgymError(f"Marker '{EOR_MELCOR}' not found in {path}.")
+
+        records = [line.split() for line in lines]
+
+        try:
+            tend_index = next(i for i in range(marker_index + 1, len(lines))
+                              if records[i] and records[i][0].upper() == 'TEND')
+        except StopIteration:
+            raise MelgymError(f"TEND not specified in the MELCOR input of {path}.")
+
+        # CFnnn00 records of the MELGEN input
+        headlines = {}
+        for tokens in records[:marker_index]:
+            if tokens and tokens[0].upper().startswith('CF') and tokens[0].endswith('00'):
+                headlines.setdefault(tokens[0][:-2].upper(), tokens)
+
+        missing = [cf for cf in control_cfs if cf.upper() not in headlines]
+        if missing:
+            raise MelgymError(f"Controlled CFs {missing} not defined in {path}.")
+
+        invalid = [cf for cf in control_cfs if len(headlines[cf.upper()]) < 5]
+        if invalid:
+            raise MelgymError(f"No scale factor in the {[cf + '00' for cf in invalid]} records of {path}.")
+
+        cf_tokens = [list(headlines[cf.upper()]) for cf in control_cfs] if redefine_cfs else []
+
+        # Episode input: TEND set and redefinition block after the marker
+        lines[tend_index] = f"TEND {tend}\n"
+        header = f"\n{'*' * 30} {title} {'*' * 30}\n"
+        footer = f"{'*' * 73}\n"
+        if redefine_cfs:
+            content = [' '.join(tokens) + '\n' for tokens in cf_tokens]
+        else:
+            content = ['']
+
+        block_index = marker_index + 2
+        cf_indices = list(range(block_index, block_index + len(cf_tokens)))
+        new_lines = lines[:marker_index + 1] + [header] + content + [footer] + lines[marker_index + 1:]
+        tend_index += len(content) + 2
+
+        return cls(new_lines, tend_index, block_index, cf_indices, cf_tokens)
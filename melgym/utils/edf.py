@@ -0,0 +1,245 @@
+"""
+EDF (External Data File) schema and reader.
+
+The schema is built once from the EDF records of a MELCOR deck:
+
+- ``EDFnnn00``: package name, number of channels and I/O mode.
+- ``EDFnnn01``: output file name.
+- ``EDFnnn02``: Fortran format of each row (e.g. ``8E20.12``).
+- ``EDFnnnAk``: recorded variables, one per channel.
+
+Each row written by MELCOR contains ``TIME`` followed by the channel values, wrapped every ``values_per_line`` values.
+"""
+
+import os
+import re
+
+import numpy as np
+
+from .deck import read_deck, record_fields
+from .exceptions import MelgymError
+
+EDF_RECORD_REGEX = re.compile(r'^EDF(\d{3})([0-9A-Z]{2})$', re.IGNORECASE)
+EDF_FORMAT_REGEX = re.compile(r'^(\d*)[EFGD](\d+)\.(\d+)$', re.IGNORECASE)
+
+
+class EdfPackage:
+    """
+    Layout of a single EDF package (one output file).
+    """
+
+    def __init__(self, package_id: str, name: str, file_name: str, fmt: str, variables: list[str]):
+        """
+        Initializes the EDF package layout.
+
+        Args:
+            package_id (str): Three-digit package identifier (e.g. '001').
+            name (str): Package name as declared in the EDFnnn00 record.
+            file_name (str): Output file name as declared in the EDFnnn01 record.
+            fmt (str): Row format as declared in the EDFnnn02 record.
+            variables (list[str]): Recorded variables, in channel order (TIME excluded).
+
+        Raises:
+            MelgymError: If the row format is not supported.
+        """
+        match = EDF_FORMAT_REGEX.match(fmt)
+        if match is None:
+            raise MelgymError(
+                f"Unsupported format '{fmt}' in EDF package {package_id}.")
+
+        self.package_id = package_id
+        self.name = name
+        self.file_name = file_name
+        self.fmt = fmt
+        self.values_per_line = int(match.group(1) or 1)
+        self.width = int(match.group(2))
+
+        # Column 0 is always TIME
+        self.columns = ['TIME'] + list(variables)
+        self.index = {var: col for col, var in enumerate(self.columns)}
+
+        self.row_len = len(self.columns)
+        self.lines_per_row = -(-self.row_len // self.values_per_line)
+        self.line_counts = [self.values_per_line] * (self.lines_per_row - 1) + \
+            [self.row_len - self.values_per_line * (self.lines_per_row - 1)]
+
+        # Upper bound of the bytes taken by a row (+1 per line for newlines)
+        self.row_size = self.lines_per_row * \
+            (self.values_per_line * self.width + 2)
+
+    def column(self, variable: str) -> int:
+        """
+        Returns the column position of a variable in this package.
+
+        Args:
+            variable (str): Variable name.
+
+        Returns:
+            int: Column position (0 corresponds to TIME).
+
+        Raises:
+            KeyError: If the variable is not recorded in this package.
+        """
+        return self.index[variable]
+
+    def read_tail(self, path: str) -> str:
+        """
+        Reads the lines of the last row written to the EDF file.
+
+        Args:
+            path (str): Path to the EDF file of this package.
+
+        Returns:
+            str: Last row, as written by MELCOR (including newlines).
+
+        Raises:
+            FileNotFoundError: If the EDF file is not found.
+            MelgymError: If the last row is partially flushed or incomplete.
+        """
+        try:
+            with open(path, 'rb') as edf:
+                edf.seek(0, os.SEEK_END)
+                file_size = edf.tell()
+                buffer_size = min(2 * self.row_size, file_size)
+                edf.seek(-buffer_size, os.SEEK_END)
+                raw_data = edf.read().decode(errors='ignore')
+        except FileNotFoundError:
+            raise FileNotFoundError(f"EDF file {path} not found.")
+
+        if not raw_data.endswith('\n'):
+            raise MelgymError(f"Partially flushed row in EDF file {path}.")
+
+        lines = [line for line in raw_data.splitlines() if line.strip()]
+        if len(lines) < self.lines_per_row:
+            raise MelgymError(f"No complete row found in EDF file {path}.")
+
+        return '\n'.join(lines[-self.lines_per_row:]) + '\n'
+
+    def read_last_row(self, path: str) -> np.ndarray:
+        """
+        Reads and validates the last complete row written to the EDF file.
+
+        Args:
+            path (str): Path to the EDF file of this package.
+
+        Returns:
+            np.array: Row values (TIME first), as np.float64.
+
+        Raises:
+            FileNotFoundError: If the EDF file is not found.
+            MelgymError: If the last row is malformed or partially flushed.
+        """
+        lines = self.read_tail(path).splitlines()
+
+        tokens = []
+        for line, count in zip(lines, self.line_counts):
+            line_tokens = line.split()
+            if len(line_tokens) != count or any(len(t) > self.width for t in line_tokens):
+                raise MelgymError(
+                    f"Malformed row in EDF file {path}: expected {self.row_len} values in {self.fmt} format.")
+            tokens.extend(line_tokens)
+
+        try:
+            return np.array(tokens, dtype=np.float64)
+        except ValueError:
+            raise MelgymError(
+                f"Failed to parse numerical values from EDF file: {path}")
+
+
+class EdfSchema:
+    """
+    Index of every EDF package and variable written by a MELCOR deck.
+    """
+
+    def __init__(self, packages: list[EdfPackage]):
+        """
+        Initializes the EDF schema.
+
+        Args:
+            packages (list[EdfPackage]): EDF packages, in package id order.
+
+        Raises:
+            MelgymError: If no EDF package is defined or a variable is recorded twice.
+        """
+        if not packages:
+            raise MelgymError("No EDF output package defined in the input file.")
+
+        self.packages = packages
+
+        # Variable name -> (package, column)
+        self.locations = {}
+        for package in packages:
+            for var in package.columns[1:]:
+                if var in self.locations:
+                    raise MelgymError(
+                        f"Variable {var} is recorded by more than one EDF package.")
+                self.locations[var] = (package, package.column(var))
+
+        self.variables = list(self.locations)
+
+    @classmethod
+    def from_deck(cls, path: str) -> 'EdfSchema':
+        """
+        Builds the EDF schema from the EDF records of a MELCOR input file.
+
+        Args:
+            path (str): Path to the MELCOR input file.
+
+        Returns:
+            EdfSchema: Schema of the EDF packages in write mode.
+
+        Raises:
+            FileNotFoundError: If the input file is not found.
+            MelgymError: If an EDF package is incomplete or inconsistent.
+        """
+        records = {}
+        for line in read_deck(path):
+            tokens = record_fields(line)
+            if not tokens:
+                continue
+            match = EDF_RECORD_REGEX.match(tokens[0])
+            if match:
+                package_id, field = match.group(1), match.group(2).upper()
+                records.setdefault(package_id, {})[field] = tokens[1:]
+
+        packages = []
+        for package_id in sorted(records):
+            fields = records[package_id]
+            for field in ('00', '01', '02'):
+                if not fields.get(field):
+                    raise MelgymError(
+                        f"Record EDF{package_id}{field} missing or empty in {path}.")
+
+            header = fields['00']
+            if header[-1].upper() != 'WRITE':
+                continue
+
+            channels = sorted(f for f in fields if f[0].isalpha())
+            variables = [fields[f][0] for f in channels if fields[f]]
+
+            if len(header) >= 2 and header[1].isdigit() and int(header[1]) != len(variables):
+                raise MelgymError(
+                    f"EDF package {package_id} declares {header[1]} channels but {len(variables)} are defined.")
+
+            packages.append(EdfPackage(package_id=package_id, name=header[0],
+                                       file_name=fields['01'][0], fmt=fields['02'][0], variables=variables))
+
+        return cls(packages)
+
+    def locate(self, variable: str) -> tuple[EdfPackage, int]:
+        """
+        Returns the package and column where a variable is recorded.
+
+        Args:
+            variable (str): Variable name.
+
+        Returns:
+            tuple: The EDF package and the column position of the variable.
+
+        Raises:
+            MelgymError: If the variable is not recorded in any EDF package.
+        """
+        try:
+            return self.locations[variable]
+        except KeyError:
+            raise MelgymError(f"Variable {variable} not recorded in the EDF.")
@@ -0,0 +1,380 @@
+"""
+Runtime metrics of MELGYM environments.
+
+Environments record counters, gauges and histograms (steps, MELCOR run time, reset time, failures, pool depth, etc.) in a MetricsRegistry, which can be exposed by one or more exporters:
+
+- PrometheusExporter: local HTTP endpoint in Prometheus text format.
+- JsonLinesExporter: periodic snapshots appended to a JSON-lines file.
+
+Registries can be pickled (e.g. when environments are created in SubprocVecEnv or sweep workers), but each process then records into its own copy. Exporters must be started in the process whose metrics are exported, e.g. one JsonLinesExporter per worker, each with its own file.
+"""
+
+import json
+import math
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0,
+                   30.0, 60.0, 120.0, 300.0, 600.0, math.inf)
+
+
+def _escape(text, quotes: bool = False) -> str:
+    """
+    Escapes backslashes and newlines (and double quotes in label values), as required by the Prometheus text format.
+    """
+    text = str(text).replace('\\', '\\\\').replace('\n', '\\n')
+    return text.replace('"', '\\"') if quotes else text
+
+
+class Metric:
+    """
+    Base class of metrics. Values are kept per label set.
+    """
+    type = 'untyped'
+
+    def __init__(self, name: str, description: str):
+        """
+        Initializes the metric.
+
+        Args:
+            name (str): Metric name.
+            description (str): Metric description.
+        """
+        self.name = name
+        self.description = description
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        """
+        Returns the samples of the metric.
+
+        Returns:
+            list[tuple[str, dict, float]]: Sample name, labels and value.
+        """
+        with self.lock:
+            return [(self.name, dict(labels), value) for labels, value in self.values.items()]
+
+
+class Counter(Metric):
+    """
+    Monotonically increasing value.
+    """
+    type = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels):
+        """
+        Increments the counter.
+
+        Args:
+            amount (float): Increment.
+            **labels: Metric labels.
+        """
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """
+    Value that can go up and down.
+    """
+    type = 'gauge'
+
+    def set(self, value: float, **labels):
+        """
+        Sets the gauge value.
+
+        Args:
+            value (float): New value.
+            **labels: Metric labels.
+        """
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = value
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values in cumulative buckets.
+    """
+    type = 'histogram'
+
+    def __init__(self, name: str, description: str, buckets: tuple = DEFAULT_BUCKETS):
+        """
+        Initializes the histogram.
+
+        Args:
+            name (str): Metric name.
+            description (str): Metric description.
+            buckets (tuple): Upper bounds of the buckets, ending with inf.
+        """
+        super().__init__(name, description)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels):
+        """
+        Records an observation.
+
+        Args:
+            value (float): Observed value.
+            **labels: Metric labels.
+        """
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            counts, total, count = self.values.get(
+                key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self.values[key] = (counts, total + value, count + 1)
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        samples = []
+        with self.lock:
+            for labels, (counts, total, count) in self.values.items():
+                for bound, bucket_count in zip(self.buckets, counts):
+                    le = '+Inf' if bound == math.inf else repr(bound)
+                    samples.append((f'{self.name}_bucket', {**dict(labels), 'le': le}, bucket_count))
+                samples.append((f'{self.name}_sum', dict(labels), total))
+                samples.append((f'{self.name}_count', dict(labels), count))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics shared by one or more environments.
+    """
+
+    def __init__(self, prefix: str = 'melgym'):
+        """
+        Initializes the registry.
+
+        Args:
+            prefix (str): Prefix of every metric name.
+        """
+        self.prefix = prefix
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def _get(self, cls, name: str, description: str, **kwargs) -> Metric:
+        """
+        Returns the metric with the given name, creating it if needed.
+        """
+        name = f'{self.prefix}_{name}'
+        with self.lock:
+            if name not in self.metrics:
+                self.metrics[name] = cls(name, description, **kwargs)
+            return self.metrics[name]
+
+    def counter(self, name: str, description: str = '') -> Counter:
+        """
+        Returns a counter of the registry.
+
+        Args:
+            name (str): Metric name, without prefix.
+            description (str): Metric description.
+
+        Returns:
+            Counter: The counter.
+        """
+        return self._get(Counter, name, description)
+
+    def gauge(self, name: str, description: str = '') -> Gauge:
+        """
+        Returns a gauge of the registry.
+
+        Args:
+            name (str): Metric name, without prefix.
+            description (str): Metric description.
+
+        Returns:
+            Gauge: The gauge.
+        """
+        return self._get(Gauge, name, description)
+
+    def histogram(self, name: str, description: str = '', buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        """
+        Returns a histogram of the registry.
+
+        Args:
+            name (str): Metric name, without prefix.
+            description (str): Metric description.
+            buckets (tuple): Upper bounds of the buckets, ending with inf.
+
+        Returns:
+            Histogram: The histogram.
+        """
+        return self._get(Histogram, name, description, buckets=buckets)
+
+    def to_prometheus(self) -> str:
+        """
+        Renders every metric in Prometheus text format.
+
+        Returns:
+            str: Metrics in Prometheus text exposition format.
+        """
+        with self.lock:
+            metrics = list(self.metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {_escape(metric.description)}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for name, labels, value in metric.samples():
+                label_str = ','.join(f'{k}="{_escape(v, quotes=True)}"' for k, v in labels.items())
+                lines.append(f'{name}{{{label_str}}} {value}' if label_str else f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> dict:
+        """
+        Returns the current value of every sample.
+
+        Returns:
+            dict: Timestamp and list of samples (name, labels and value).
+        """
+        with self.lock:
+            metrics = list(self.metrics.values())
+
+        return {
+            'timestamp': time.time(),
+            'samples': [{'name': name, 'labels': labels, 'value': value}
+                        for metric in metrics for name, labels, value in metric.samples()]
+        }
+
+
+class MetricsExporter:
+    """
+    Base class of metrics exporters, which publish a registry in the background.
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        """
+        Initializes the exporter.
+
+        Args:
+            registry (MetricsRegistry): Registry to export.
+        """
+        self.registry = registry
+
+    def start(self):
+        """
+        Starts exporting metrics.
+        """
+        raise NotImplementedError
+
+    def stop(self):
+        """
+        Stops exporting metrics.
+        """
+        raise NotImplementedError
+
+
+class PrometheusExporter(MetricsExporter):
+    """
+    Serves the registry in Prometheus text format through a local HTTP endpoint.
+    """
+
+    def __init__(self, registry: MetricsRegistry, port: int = 8000, addr: str = '127.0.0.1'):
+        """
+        Initializes the exporter.
+
+        Args:
+            registry (MetricsRegistry): Registry to export.
+            port (int): Port of the HTTP endpoint.
+            addr (str): Address of the HTTP endpoint.
+        """
+        super().__init__(registry)
+        self.port = port
+        self.addr = addr
+        self.server = None
+
+    def start(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((self.addr, self.port), Handler)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+class JsonLinesExporter(MetricsExporter):
+    """
+    Periodically appends snapshots of the registry to a JSON-lines file.
+    """
+
+    def __init__(self, registry: MetricsRegistry, path: str, interval: float = 10.0):
+        """
+        Initializes the exporter.
+
+        Args:
+            registry (MetricsRegistry): Registry to export.
+            path (str): Path to the JSON-lines file.
+            interval (float): Seconds between snapshots.
+        """
+        super().__init__(registry)
+        self.path = path
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+        self.write()
+
+    def write(self):
+        """
+        Appends a snapshot of the registry to the file.
+        """
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(self.registry.snapshot()) + '\n')
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.write()
@@ -0,0 +1,314 @@
+"""
+Parallel hyperparameter and scenario sweeps.
+
+Each run trains and evaluates an agent on its own environments. Runs are scheduled onto a fixed pool of CPU slots (disjoint sets of cores), so that the MELCOR processes of concurrent runs never share cores. Finished runs are recorded in a results table and interrupted runs are resumed from their latest checkpoint.
+
+Requires the ``rl`` extra (``stable-baselines3`` and ``sb3-contrib``).
+"""
+
+import csv
+import hashlib
+import itertools
+import json
+import multiprocessing as mp
+import os
+import time
+import warnings
+
+import gymnasium as gym
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Optional
+
+from .constants import OUTPUT_DIR
+from .cpu import cpu_slots, pin_process, thread_vars
+from .exceptions import MelgymError, MelgymWarning
+
+def run_id(env_params: dict, agent_params: dict, seed: int) -> str:
+    """
+    Returns a deterministic identifier for a run configuration.
+
+    Args:
+        env_params (dict): Environment parameters.
+        agent_params (dict): Agent parameters.
+        seed (int): Random seed.
+
+    Returns:
+        str: Run identifier.
+    """
+    config = json.dumps({'env': env_params, 'agent': agent_params, 'seed': seed},
+                        sort_keys=True, default=str)
+    return 'run_' + hashlib.sha1(config.encode()).hexdigest()[:10]
+
+
+def _atomic_json_dump(obj: dict, path: str):
+    """
+    Writes a JSON file atomically.
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(obj, f, default=str)
+    os.replace(tmp_path, path)
+
+
+def _run(config: dict, slots) -> dict:
+    """
+    Trains and evaluates an agent for a single run configuration.
+
+    Executed in a worker process. A CPU slot is taken from the shared queue for the whole run and returned afterwards.
+
+    Args:
+        config (dict): Run configuration.
+        slots (Queue): Shared queue of free CPU slots.
+
+    Returns:
+        dict: Run results.
+    """
+    from stable_baselines3.common.callbacks import CheckpointCallback
+    from stable_baselines3.common.evaluation import evaluate_policy
+    from stable_baselines3.common.monitor import Monitor
+
+    import melgym  # Registers the environments in spawned workers
+
+    slot = slots.get()
+    try:
+        pin_process(slot)
+        os.environ.update(thread_vars(len(slot)))
+        import torch
+        torch.set_num_threads(len(slot))
+
+        run_dir = config['run_dir']
+        checkpoint_dir = os.path.join(run_dir, 'checkpoints')
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+        def make_env(suffix):
+            env = gym.make(config['env_id'], output_dir=f"{config['run_id']}_{suffix}",
+                           **config['env_params'])
+            if config['env_wrapper'] is not None:
+                env = config['env_wrapper'](env)
+            return Monitor(env, filename=os.path.join(run_dir, f'{suffix}_monitor.csv'))
+
+        env = make_env('train')
+        agent_cls = config['agent_cls']
+
+        # Resume from the latest checkpoint, if any
+        checkpoints = sorted((f for f in os.listdir(checkpoint_dir) if f.endswith('.zip')),
+                             key=lambda f: int(f.split('_')[-2]))
+        if checkpoints:
+            agent = agent_cls.load(os.path.join(checkpoint_dir, checkpoints[-1]),
+                                   env=env, device='cpu')
+        else:
+            agent = agent_cls(config['policy'], env=env, device='cpu', seed=config['seed'],
+                              **config['agent_params'])
+
+        remaining = config['total_timesteps'] - agent.num_timesteps
+        start = time.time()
+        if remaining > 0:
+            agent.learn(total_timesteps=remaining, reset_num_timesteps=not checkpoints,
+                        callback=CheckpointCallback(config['checkpoint_freq'], checkpoint_dir))
+        agent.save(os.path.join(run_dir, 'model'))
+        env.close()
+
+        eval_env = make_env('eval')
+        mean_reward, std_reward = evaluate_policy(
+            agent, eval_env, n_eval_episodes=config['n_eval_episodes'], deterministic=True)
+        eval_env.close()
+
+        result = {
+            'run_id': config['run_id'],
+            'cpus': ' '.join(map(str, slot)),
+            'timesteps': agent.num_timesteps,
+            'train_time': time.time() - start,
+            'mean_reward': float(mean_reward),
+            'std_reward': float(std_reward),
+            **{f'env.{k}': v for k, v in config['env_params'].items()},
+            **{f'agent.{k}': v for k, v in config['agent_params'].items()},
+        }
+        _atomic_json_dump(result, os.path.join(run_dir, 'result.json'))
+        return result
+    finally:
+        slots.put(slot)
+
+
+class SweepRunner:
+    """
+    Grid or random search over environment and agent parameters.
+
+    Every combination of the values listed in ``env_grid`` and ``agent_grid`` defines a run (or ``n_samples`` random combinations in random mode). Runs are executed in parallel, one per CPU slot.
+    """
+
+    def __init__(
+        self,
+        env_id: str,
+        env_grid: dict[str, list],
+        agent_grid: Optional[dict[str, list]] = None,
+        agent_cls=None,
+        policy: str = 'MlpLstmPolicy',
+        total_timesteps: int = 10_000,
+        n_eval_episodes: int = 5,
+        checkpoint_freq: int = 1_000,
+        mode: str = 'grid',
+        n_samples: Optional[int] = None,
+        seeds: Optional[list[int]] = None,
+        cpus_per_run: int = 1,
+        n_cpus: Optional[int] = None,
+        env_wrapper: Optional[Callable] = None,
+        results_dir: Optional[str] = None
+    ):
+        """
+        Initializes the sweep runner.
+
+        Args:
+            env_id (str): Registered environment id (e.g. 'pressure-v0').
+            env_grid (dict[str, list]): Candidate values of each environment parameter (e.g. control_horizon, setpoints, min_action_value, max_action_value).
+            agent_grid (Optional[dict[str, list]]): Candidate values of each agent parameter.
+            agent_cls: Stable-Baselines3 algorithm class. If None, RecurrentPPO is used.
+            policy (str): Policy name passed to the agent.
+            total_timesteps (int): Training timesteps of each run.
+            n_eval_episodes (int): Evaluation episodes of each run.
+            checkpoint_freq (int): Timesteps between checkpoints, used to resume interrupted runs.
+            mode (str): Search mode, 'grid' or 'random'.
+            n_samples (Optional[int]): Number of sampled configurations in random mode.
+            seeds (Optional[list[int]]): Seeds of each configuration. Each seed defines a separate run. If None, a single run with seed 0 is used.
+            cpus_per_run (int): Cores assigned to each run.
+            n_cpus (Optional[int]): Maximum number of cores to use. If None, every available core is used.
+            env_wrapper (Optional[Callable]): Picklable function applied to each environment (e.g. to rescale actions).
+            results_dir (Optional[str]): Directory for run files and the results table. If None, a default directory is used.
+
+        Raises:
+            MelgymError: If the search mode is not supported.
+        """
+        if mode not in ('grid', 'random'):
+            raise MelgymError(f"Unsupported sweep mode: {mode}")
+        if mode == 'random' and not n_samples:
+            raise MelgymError("n_samples must be specified in random mode.")
+
+        if agent_cls is None:
+            from sb3_contrib import RecurrentPPO
+            agent_cls = RecurrentPPO
+
+        self.env_id = env_id
+        self.env_grid = env_grid
+        self.agent_grid = agent_grid if agent_grid is not None else {}
+        self.agent_cls = agent_cls
+        self.policy = policy
+        self.total_timesteps = total_timesteps
+        self.n_eval_episodes = n_eval_episodes
+        self.checkpoint_freq = checkpoint_freq
+        self.mode = mode
+        self.n_samples = n_samples
+        self.seeds = seeds if seeds is not None else [0]
+        self.env_wrapper = env_wrapper
+
+        self.slots = cpu_slots(cpus_per_run, n_cpus)
+
+        self.results_dir = results_dir if results_dir is not None else os.path.join(
+            OUTPUT_DIR, 'sweeps', env_id)
+        self.results_path = os.path.join(self.results_dir, 'results.csv')
+
+    def configs(self) -> list[dict]:
+        """
+        Builds the configuration of every run in the sweep.
+
+        Returns:
+            list[dict]: Run configurations. Repeated random samples are only included once.
+        """
+        grid = {**{('env', k): v for k, v in self.env_grid.items()},
+                **{('agent', k): v for k, v in self.agent_grid.items()}}
+        keys = list(grid)
+
+        if self.mode == 'grid':
+            combinations = list(itertools.product(*grid.values()))
+        else:
+            rng = np.random.default_rng(self.seeds[0])
+            combinations = [tuple(values[rng.integers(len(values))] for values in grid.values())
+                            for _ in range(self.n_samples)]
+
+        configs, seen = [], set()
+        for combination in combinations:
+            params = dict(zip(keys, combination))
+            env_params = {k: v for (group, k), v in params.items() if group == 'env'}
+            agent_params = {k: v for (group, k), v in params.items() if group == 'agent'}
+
+            for seed in self.seeds:
+                rid = run_id(env_params, agent_params, seed)
+                if rid in seen:
+                    continue
+                seen.add(rid)
+                configs.append({
+                    'run_id': rid,
+                    'run_dir': os.path.join(self.results_dir, rid),
+                    'env_id': self.env_id,
+                    'env_params': env_params,
+                    'env_wrapper': self.env_wrapper,
+                    'agent_cls': self.agent_cls,
+                    'agent_params': agent_params,
+                    'policy': self.policy,
+                    'seed': seed,
+                    'total_timesteps': self.total_timesteps,
+                    'n_eval_episodes': self.n_eval_episodes,
+                    'checkpoint_freq': self.checkpoint_freq,
+                })
+
+        return configs
+
+    def run(self) -> list[dict]:
+        """
+        Executes every pending run of the sweep and collects the results.
+
+        Runs with a stored result are skipped, and runs with checkpoints are resumed.
+
+        Returns:
+            list[dict]: Results of every run in the sweep.
+        """
+        os.makedirs(self.results_dir, exist_ok=True)
+
+        results, pending = [], []
+        for config in self.configs():
+            result_path = os.path.join(config['run_dir'], 'result.json')
+            if os.path.isfile(result_path):
+                with open(result_path, 'r') as f:
+                    results.append(json.load(f))
+            else:
+                pending.append(config)
+
+        if pending:
+            ctx = mp.get_context('spawn')
+            manager = ctx.Manager()
+            slots = manager.Queue()
+            for slot in self.slots:
+                slots.put(slot)
+
+            with ProcessPoolExecutor(max_workers=len(self.slots), mp_context=ctx) as pool:
+                futures = {pool.submit(_run, config, slots): config for config in pending}
+                for future in as_completed(futures):
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        warnings.warn(
+                            f"Run {futures[future]['run_id']} failed: {e}", MelgymWarning)
+                    self._write_results(results)
+
+            manager.shutdown()
+
+        self._write_results(results)
+        return results
+
+    def _write_results(self, results: list[dict]):
+        """
+        Writes the results table as CSV.
+
+        Args:
+            results (list[dict]): Results of the finished runs.
+        """
+        fieldnames = []
+        for result in results:
+            fieldnames.extend(k for k in result if k not in fieldnames)
+
+        tmp_path = self.results_path + '.tmp'
+        with open(tmp_path, mode='w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(results)
+        os.replace(tmp_path, self.results_path)
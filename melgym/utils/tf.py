@@ -0,0 +1,119 @@
+"""
+Tabular function (TF) schedules.
+
+In TF actuation mode, each controlled CF is a ``TAB-FUN`` of ``TIME`` that references a tabular function (record ``CFnnn05``). Actions are written as breakpoints of that TF, so several control intervals can be simulated in a single MELCOR execution.
+
+TF records:
+
+- ``TFnnn00``: name, number of (X, Y) pairs, scale factor and (optional) additive constant.
+- ``TFnnnkk``: (X, Y) pairs, with ``kk`` from 10 to 99.
+"""
+
+from typing import Callable, Optional
+
+from .deck import read_deck, record_fields
+from .exceptions import MelgymError
+
+TF_FIRST_RECORD = 10
+TF_LAST_RECORD = 99
+TF_PAIRS_PER_RECORD = 2
+TF_MAX_PAIRS = (TF_LAST_RECORD - TF_FIRST_RECORD + 1) * TF_PAIRS_PER_RECORD
+
+
+def _read_records(path: str) -> dict[str, list[str]]:
+    """
+    Reads the CF and TF records of a MELCOR input file, without comments.
+
+    Args:
+        path (str): Path to the MELCOR input file.
+
+    Returns:
+        dict[str, list[str]]: Record fields by record id (first definition only).
+
+    Raises:
+        FileNotFoundError: If the input file is not found.
+    """
+    records = {}
+    for line in read_deck(path):
+        tokens = record_fields(line)
+        if tokens and tokens[0][:2].upper() in ('CF', 'TF'):
+            records.setdefault(tokens[0].upper(), tokens[1:])
+    return records
+
+
+def find_control_tfs(path: str, control_cfs: list[str],
+                     control_tfs: Optional[list[str]] = None) -> list[tuple[str, list[str]]]:
+    """
+    Finds the TF referenced by each controlled CF and its TFnnn00 record.
+
+    Args:
+        path (str): Path to the MELCOR input file.
+        control_cfs (list[str]): Controlled CFs (e.g. 'CF007').
+        control_tfs (Optional[list[str]]): TF of each controlled CF (e.g. 'TF007'). If None, the TF referenced in the CFnnn05 record of each CF is used.
+
+    Returns:
+        list[tuple[str, list[str]]]: TF id and TFnnn00 fields of each controlled CF, in control_cfs order.
+
+    Raises:
+        MelgymError: If a controlled CF does not reference a TF, or a TF is not defined.
+    """
+    records = _read_records(path)
+
+    if control_tfs is not None and len(control_tfs) != len(control_cfs):
+        raise MelgymError(
+            f"{len(control_tfs)} TFs given for {len(control_cfs)} controlled CFs.")
+
+    tfs = []
+    for i, cf_id in enumerate(control_cfs):
+        if control_tfs is not None:
+            tf_id = control_tfs[i].upper()
+        else:
+            fields = records.get(f'{cf_id.upper()}05')
+            if not fields or not fields[0].isdigit():
+                raise MelgymError(
+                    f"{cf_id} does not reference a tabular function (record {cf_id}05).")
+            tf_id = f'TF{int(fields[0]):03d}'
+
+        header = records.get(f'{tf_id}00')
+        if not header or len(header) < 3:
+            raise MelgymError(
+                f"Tabular function {tf_id} (controlling {cf_id}) not defined.")
+        tfs.append((tf_id, header))
+
+    return tfs
+
+
+def tf_records(tf_id: str, header: list[str], points: list[tuple[float, float]],
+               fmt: Callable[[float], str], x_fmt: Callable[[float], str] = repr) -> list[str]:
+    """
+    Builds the records of a TF with the given breakpoints.
+
+    Args:
+        tf_id (str): TF id (e.g. 'TF007').
+        header (list[str]): Fields of the original TFnnn00 record.
+        points (list[tuple[float, float]]): (X, Y) breakpoints, with strictly increasing X.
+        fmt (Callable[[float], str]): Formatter of the Y values.
+        x_fmt (Callable[[float], str]): Formatter of the X values. By default, the shortest representation that round-trips the float is used.
+
+    Returns:
+        list[str]: TF input lines.
+
+    Raises:
+        MelgymError: If there are no breakpoints or more than TF records can hold, or if the written X values are not strictly increasing.
+    """
+    if not 1 <= len(points) <= TF_MAX_PAIRS:
+        raise MelgymError(
+            f"{len(points)} breakpoints given for {tf_id}, between 1 and {TF_MAX_PAIRS} are supported.")
+
+    x_values = [x_fmt(float(x)) for x, _ in points]
+    if any(float(a) >= float(b) for a, b in zip(x_values, x_values[1:])):
+        raise MelgymError(
+            f"Breakpoint times of {tf_id} are not strictly increasing once written: {x_values}.")
+
+    lines = [' '.join([f'{tf_id}00', header[0], str(len(points))] + header[2:]) + '\n']
+    for k in range(0, len(points), TF_PAIRS_PER_RECORD):
+        pairs = zip(x_values[k:k + TF_PAIRS_PER_RECORD], points[k:k + TF_PAIRS_PER_RECORD])
+        fields = [field for x, (_, y) in pairs for field in (x, fmt(y))]
+        record = TF_FIRST_RECORD + k // TF_PAIRS_PER_RECORD
+        lines.append(' '.join([f'{tf_id}{record:02d}'] + fields) + '\n')
+    return lines
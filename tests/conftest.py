@@ -0,0 +1,83 @@
+import os
+import stat
+import textwrap
+
+import pytest
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'melgym', 'data')
+
+# Stand-ins for MELGEN/MELCOR: the "pressure" is the sum of the CF00700 scale factors applied so far
+STUB_MELGEN = """\
+    #!/usr/bin/env python3
+    import os, sys
+    if os.environ.get('STUB_MELGEN_FAIL') and 'episode_' in os.getcwd():
+        sys.exit(1)
+    open('MELRST', 'w').write('0.0\\n')
+"""
+
+STUB_MELCOR = """\
+    #!/usr/bin/env python3
+    import os, sys, time
+    time.sleep(float(os.environ.get('STUB_MELCOR_SLEEP', 0)))
+    melin = [arg[2:] for arg in sys.argv[1:] if arg.startswith('i=')][0]
+    records = [line.split() for line in open(melin)]
+    tend = float(next(r[1] for r in records if r and r[0] == 'TEND'))
+    marker = next(i for i, r in enumerate(records) if r[:2] == ['*EOR*', 'MELCOR'])
+    scale = [float(r[4]) for r in records[marker:] if r and r[0] == 'CF00700']
+    pressure = float(open('MELRST').read()) + (scale[0] if scale else 0.0)
+    open('MELRST', 'w').write(f'{pressure}\\n')
+    channels = {r[0][3:6]: int(r[2]) for r in records if r and r[0].startswith('EDF') and r[0].endswith('00')}
+    for r in records:
+        if r and r[0].startswith('EDF') and r[0].endswith('01'):
+            time = 0.0 if 'STALE' in r[1] else tend
+            row = [time] + [pressure] * channels[r[0][3:6]]
+            with open(r[1], 'a') as f:
+                for i in range(0, len(row), 8):
+                    f.write(''.join(f'{v:20.12E}' for v in row[i:i + 8]) + '\\n')
+    sys.exit(int(os.environ.get('STUB_MELCOR_EXIT', 0)))
+"""
+
+
+@pytest.fixture
+def data_path():
+    """
+    Returns the path to a model of the data directory.
+    """
+    return lambda name: os.path.join(DATA_DIR, name)
+
+
+@pytest.fixture
+def stubs(tmp_path):
+    """
+    Writes the MELGEN/MELCOR stand-ins and returns their paths.
+    """
+    paths = []
+    for name, source in (('MELGEN', STUB_MELGEN), ('MELCOR', STUB_MELCOR)):
+        path = tmp_path / 'bin' / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(textwrap.dedent(source))
+        path.chmod(path.stat().st_mode | stat.S_IEXEC)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def make_env(tmp_path, stubs, data_path):
+    """
+    Returns a factory of pressure environments run by the MELGEN/MELCOR stand-ins.
+    """
+    from melgym.envs.pressure import PressureEnv
+
+    envs = []
+
+    def factory(melcor_model=None, output_dir='out', control_cfs=('CF007',), **kwargs):
+        env = PressureEnv(melcor_model or data_path('pressure.inp'), list(control_cfs), 0.0, 5.0,
+                          [101000.0], 50, melgen_path=stubs[0], melcor_path=stubs[1],
+                          output_dir=str(tmp_path / output_dir), **kwargs)
+        envs.append(env)
+        return env
+
+    yield factory
+
+    for env in envs:
+        env.close()
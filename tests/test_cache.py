@@ -0,0 +1,79 @@
+import os
+import time
+
+from melgym.utils.cache import TransitionCache, state_key
+
+
+def make_output(path, size=100):
+    os.makedirs(path, exist_ok=True)
+    for file, content in (('MELRST', 'x' * size), ('MELIN', 'input'), ('MELOG', 'log')):
+        with open(os.path.join(path, file), 'w') as f:
+            f.write(content)
+
+
+def test_state_key():
+    assert state_key('a', 1) == state_key('a', 1)
+    assert state_key('a', 1) != state_key('a', 2)
+    assert state_key('ab', 'c') != state_key('a', 'bc')
+
+
+def test_get_put(tmp_path):
+    output_dir = str(tmp_path / 'out')
+    make_output(output_dir)
+    cache = TransitionCache(str(tmp_path / 'cache'), 10 ** 6)
+
+    assert not cache.get('k', output_dir)
+    cache.put('k', output_dir)
+    assert sorted(os.listdir(tmp_path / 'cache' / 'k')) == ['MELRST']
+
+    restored = str(tmp_path / 'restored')
+    os.makedirs(restored)
+    assert cache.get('k', restored)
+    assert open(os.path.join(restored, 'MELRST')).read() == 'x' * 100
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_lru_eviction(tmp_path):
+    output_dir = str(tmp_path / 'out')
+    make_output(output_dir)
+    cache = TransitionCache(str(tmp_path / 'cache'), 250)
+
+    for key in ('a', 'b'):
+        cache.put(key, output_dir)
+        time.sleep(0.01)
+    assert cache.get('a', output_dir)
+    time.sleep(0.01)
+    cache.put('c', output_dir)
+
+    assert sorted(os.listdir(tmp_path / 'cache')) == ['a', 'c']
+    assert cache.stats()['evictions'] == 1
+
+
+def test_shared_directory(tmp_path):
+    output_dir = str(tmp_path / 'out')
+    make_output(output_dir)
+    cache_dir = str(tmp_path / 'cache')
+    first, second = TransitionCache(cache_dir, 250), TransitionCache(cache_dir, 250)
+
+    for i in range(3):
+        first.put(f'a{i}', output_dir)
+        time.sleep(0.01)
+        second.put(f'b{i}', output_dir)
+        time.sleep(0.01)
+
+    assert sorted(os.listdir(cache_dir)) == ['a2', 'b2']
+
+
+def test_rescan_only_when_full(tmp_path, monkeypatch):
+    output_dir = str(tmp_path / 'out')
+    make_output(output_dir)
+    cache = TransitionCache(str(tmp_path / 'cache'), 250)
+
+    scans = []
+    monkeypatch.setattr(cache, '_scan', lambda: scans.append(1) or TransitionCache._scan(cache))
+    cache.put('a', output_dir)
+    cache.put('b', output_dir)
+    assert not scans
+
+    cache.put('c', output_dir)
+    assert len(scans) == 1
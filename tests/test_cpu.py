@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from melgym.utils import cpu
+
+
+@pytest.fixture
+def eight_cpus(monkeypatch):
+    monkeypatch.setattr(cpu, 'available_cpus', lambda: list(range(8)))
+
+
+def test_cpu_slots(eight_cpus):
+    assert cpu.cpu_slots(2) == [[0, 1], [2, 3], [4, 5], [6, 7]]
+    assert cpu.cpu_slots(3) == [[0, 1, 2], [3, 4, 5]]
+    assert cpu.cpu_slots(2, n_cpus=4) == [[0, 1], [2, 3]]
+
+
+def test_cpu_slots_too_large(eight_cpus):
+    with pytest.warns(cpu.MelgymWarning):
+        assert cpu.cpu_slots(16) == [list(range(8))]
+
+
+def test_env_cpu_sets(eight_cpus):
+    assert cpu.env_cpu_sets(3, cpus_per_env=2) == [[1, 2], [3, 4], [5, 6]]
+    with pytest.warns(cpu.MelgymWarning):
+        assert cpu.env_cpu_sets(4, cpus_per_env=2, reserved=2) == [[2, 3], [4, 5], [6, 7], [2, 3]]
+
+
+def test_valid_cpus(eight_cpus):
+    assert cpu.valid_cpus(None) is None
+    with pytest.warns(cpu.MelgymWarning):
+        assert cpu.valid_cpus([6, 7, 8]) == [6, 7]
+
+
+def test_thread_vars():
+    assert cpu.thread_vars(2) == {'OMP_NUM_THREADS': '2', 'MKL_NUM_THREADS': '2', 'OPENBLAS_NUM_THREADS': '2'}
+
+
+@pytest.mark.skipif(not hasattr(os, 'sched_setaffinity'), reason='No CPU affinity support')
+def test_spawn_affinity():
+    before = os.sched_getaffinity(0)
+    target = [min(before)]
+    with cpu.spawn_affinity(target):
+        output = subprocess.check_output(
+            [sys.executable, '-c', 'import os; print(sorted(os.sched_getaffinity(0)))'])
+
+    assert output.decode().strip() == str(target)
+    assert os.sched_getaffinity(0) == before
+
+
+@pytest.mark.skipif(os.name != 'posix', reason='No nice command')
+def test_nice_command():
+    assert cpu.nice_command(0) == []
+    output = subprocess.check_output(
+        cpu.nice_command(3) + [sys.executable, '-c', 'import os; print(os.nice(0))'])
+    assert int(output) == os.nice(0) + 3
@@ -0,0 +1,71 @@
+import pytest
+
+from melgym.utils.deck import ControlPlan, record_fields, strip_comments
+from melgym.utils.exceptions import MelgymError
+
+
+def test_control_plan(data_path):
+    plan = ControlPlan.from_deck(data_path('pressure.inp'), ['CF007', 'CF001'], 10, 'CONTROLLERS')
+
+    assert plan.lines[plan.tend_index] == 'TEND 10\n'
+    assert [plan.lines[i].split()[0] for i in plan.cf_indices] == ['CF00700', 'CF00100']
+    assert plan.cf_tokens[0][:5] == ['CF00700', 'CONTROLLER', 'MULTIPLY', '2', '1.0']
+    assert '*EOR* MELCOR' in plan.lines[plan.block_index - 2]
+    # Comments are removed
+    assert not any(line.startswith('* ') for line in plan.lines)
+
+
+def test_control_plan_tf_block(data_path):
+    plan = ControlPlan.from_deck(data_path('pressure.inp'), ['CF007'], 10, 'TABULAR FUNCTIONS',
+                                 redefine_cfs=False)
+
+    assert plan.cf_indices == [] and plan.lines[plan.block_index] == ''
+    assert plan.lines[plan.tend_index] == 'TEND 10\n'
+
+
+def test_missing_cf(data_path):
+    with pytest.raises(MelgymError):
+        ControlPlan.from_deck(data_path('pressure.inp'), ['CF123'], 10, 'CONTROLLERS')
+
+
+def test_commented_cf(data_path):
+    with pytest.raises(MelgymError):
+        ControlPlan.from_deck(data_path('pressure.inp'), ['CF002'], 10, 'CONTROLLERS')
+
+
+def test_missing_tend(data_path, tmp_path):
+    with open(data_path('pressure.inp')) as f:
+        lines = [line for line in f if not line.strip().startswith('TEND')]
+    deck = tmp_path / 'deck.inp'
+    deck.write_text(''.join(lines))
+
+    with pytest.raises(MelgymError, match='TEND'):
+        ControlPlan.from_deck(str(deck), ['CF007'], 10, 'CONTROLLERS')
+
+
+def test_missing_marker(data_path, tmp_path):
+    with open(data_path('pressure.inp')) as f:
+        lines = [line for line in f if '*EOR* MELCOR' not in line]
+    deck = tmp_path / 'deck.inp'
+    deck.write_text(''.join(lines))
+
+    with pytest.raises(MelgymError, match='EOR'):
+        ControlPlan.from_deck(str(deck), ['CF007'], 10, 'CONTROLLERS')
+
+
+def test_comments(data_path, tmp_path):
+    with open(data_path('pressure.inp')) as f:
+        source = f.read()
+    deck = tmp_path / 'deck.inp'
+    deck.write_text(source.replace('CF00700   CONTROLLER  MULTIPLY  2  1.0',
+                                   'CF00700   CONTROLLER  MULTIPLY  2  1.0  ! note'))
+
+    plan = ControlPlan.from_deck(str(deck), ['CF007'], 10, 'CONTROLLERS')
+    assert plan.cf_tokens == [['CF00700', 'CONTROLLER', 'MULTIPLY', '2', '1.0']]
+    assert '!' not in ''.join(plan.lines)
+
+
+def test_strip_comments():
+    lines = ['*EOR* MELCOR\n', '* comment\n', '! comment\n', 'TEND 10 * end\n', 'CF00100 A ! b\n', 'DTMAX 1\n']
+    assert strip_comments(lines) == ['*EOR* MELCOR\n', 'TEND 10 \n', 'CF00100 A \n', 'DTMAX 1\n']
+    assert record_fields('EDF00100 OUT 1 WRITE ! channels') == ['EDF00100', 'OUT', '1', 'WRITE']
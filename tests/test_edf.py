@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from melgym.utils.edf import EdfPackage, EdfSchema
+from melgym.utils.exceptions import MelgymError
+
+
+def write_rows(path, rows, values_per_line=8, width=20):
+    with open(path, 'w') as f:
+        for row in rows:
+            for i in range(0, len(row), values_per_line):
+                f.write(''.join(f'{v:{width}.12E}' for v in row[i:i + values_per_line]) + '\n')
+
+
+def test_schema_from_deck(data_path):
+    schema = EdfSchema.from_deck(data_path('branch_1.inp'))
+
+    assert len(schema.packages) == 1
+    package = schema.packages[0]
+    assert package.file_name == 'PRESSURES.DAT'
+    assert package.values_per_line == 8 and package.width == 20
+    assert schema.variables == ['CVH-P.1', 'CVH-P.6', 'CVH-P.11', 'CVH-P.26', 'CVH-P.83', 'CVH-P.86']
+    assert schema.locate('CVH-P.11') == (package, 3)
+
+
+def test_schema_unknown_variable(data_path):
+    schema = EdfSchema.from_deck(data_path('pressure.inp'))
+    with pytest.raises(MelgymError):
+        schema.locate('CVH-P.999')
+
+
+def test_schema_channel_count_mismatch(tmp_path):
+    deck = tmp_path / 'deck.inp'
+    deck.write_text('EDF00100 OUT 2 WRITE\nEDF00101 OUT.DAT\nEDF00102 8E20.12\nEDF001A0 CVH-P.1\n')
+    with pytest.raises(MelgymError):
+        EdfSchema.from_deck(str(deck))
+
+
+def test_read_last_row(tmp_path):
+    package = EdfPackage('001', 'OUT', 'OUT.DAT', '8E20.12', ['A', 'B'])
+    path = tmp_path / 'OUT.DAT'
+    write_rows(path, [[10.0, 1.0, 2.0], [20.0, 3.0, 4.0]])
+
+    row = package.read_last_row(str(path))
+    assert row.dtype == np.float64
+    np.testing.assert_array_equal(row, [20.0, 3.0, 4.0])
+
+
+def test_read_last_row_wrapped(tmp_path):
+    variables = [f'V{i}' for i in range(11)]
+    package = EdfPackage('001', 'OUT', 'OUT.DAT', '8E20.12', variables)
+    path = tmp_path / 'OUT.DAT'
+    rows = [[10.0] + [float(i) for i in range(11)], [20.0] + [float(i + 100) for i in range(11)]]
+    write_rows(path, rows)
+
+    assert package.lines_per_row == 2
+    np.testing.assert_array_equal(package.read_last_row(str(path)), rows[-1])
+
+
+def test_read_last_row_partial(tmp_path):
+    package = EdfPackage('001', 'OUT', 'OUT.DAT', '8E20.12', ['A', 'B'])
+    path = tmp_path / 'OUT.DAT'
+    write_rows(path, [[10.0, 1.0, 2.0]])
+    with open(path, 'a') as f:
+        f.write(f'{20.0:20.12E}{3.0:20.12E}')
+
+    with pytest.raises(MelgymError):
+        package.read_last_row(str(path))
+
+
+def test_read_last_row_malformed(tmp_path):
+    package = EdfPackage('001', 'OUT', 'OUT.DAT', '8E20.12', ['A', 'B'])
+    path = tmp_path / 'OUT.DAT'
+    write_rows(path, [[10.0, 1.0]])
+
+    with pytest.raises(MelgymError):
+        package.read_last_row(str(path))
+
+
+def test_read_last_row_missing(tmp_path):
+    package = EdfPackage('001', 'OUT', 'OUT.DAT', '8E20.12', ['A'])
+    with pytest.raises(FileNotFoundError):
+        package.read_last_row(str(tmp_path / 'OUT.DAT'))
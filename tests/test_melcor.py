@@ -0,0 +1,168 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from melgym.utils.exceptions import MelgymError, MelgymWarning
+
+
+def two_package_deck(data_path, tmp_path, file_name):
+    with open(data_path('pressure.inp')) as f:
+        lines = f.readlines()
+    index = next(i for i, line in enumerate(lines) if line.startswith('EDF001A1')) + 1
+    lines[index:index] = ['EDF00200  SECOND 1 WRITE\n', f'EDF00201  {file_name}\n',
+                          'EDF00202  8E20.12\n', 'EDF002A0  CVH-P.1\n']
+    deck = tmp_path / 'deck.inp'
+    deck.write_text(''.join(lines))
+    return str(deck)
+
+
+def test_step(make_env):
+    env = make_env()
+    env.reset()
+    obs, _, _, _, info = env.step(np.array([2.0]))
+
+    assert info['TIME'] == 10.0 and obs.tolist() == [2.0]
+    obs, _, _, _, info = env.step(np.array([1.0]))
+    assert info['TIME'] == 20.0 and obs.tolist() == [3.0]
+
+
+def test_edf_packages(make_env, data_path, tmp_path):
+    env = make_env(melcor_model=two_package_deck(data_path, tmp_path, 'SECOND.DAT'))
+    env.reset()
+    obs, _, _, _, info = env.step(np.array([2.0]))
+
+    assert env.controlled_values == ['CVH-P.2', 'CVH-P.1']
+    assert obs.tolist() == [2.0, 2.0]
+
+
+def test_stale_edf_package(make_env, data_path, tmp_path):
+    env = make_env(melcor_model=two_package_deck(data_path, tmp_path, 'STALE.DAT'))
+    env.reset()
+
+    with pytest.raises(MelgymError, match='STALE.DAT'):
+        env.step(np.array([2.0]))
+
+
+def test_close_only_terminates_own_processes(make_env):
+    first, second = make_env(output_dir='first'), make_env(output_dir='second')
+    first.reset()
+    second.reset()
+    first.close()
+
+    obs, _, _, _, _ = second.step(np.array([2.0]))
+    assert obs.tolist() == [2.0]
+    assert not first.processes and not second.processes
+
+
+def test_close_terminates_running_process(make_env, monkeypatch):
+    env = make_env()
+    env.reset()
+    monkeypatch.setenv('STUB_MELCOR_SLEEP', '60')
+
+    errors = []
+
+    def step():
+        try:
+            env.step(np.array([2.0]))
+        except MelgymError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=step)
+    thread.start()
+    while not env.processes:
+        time.sleep(0.01)
+    env.close()
+    thread.join(timeout=10)
+
+    assert not thread.is_alive() and errors
+
+
+def test_dtypes(make_env):
+    env = make_env(cf_precision=3)
+    env.reset()
+    obs, _, _, _, info = env.step(np.array([1.2345678], dtype=np.float32))
+
+    assert obs.dtype == np.float32 and env.action_space.dtype == np.float32
+    assert env.cf_values == ['1.235E+00']
+    # info keeps the full EDF precision
+    assert isinstance(info['CVH-P.2'], float) and info['CVH-P.2'] == 1.235
+
+
+def test_obs_dtype(make_env):
+    env = make_env(obs_dtype=np.float64, action_dtype=np.float64)
+    obs, _ = env.reset()
+    assert obs.dtype == np.float64 and env.action_space.dtype == np.float64
+
+
+def test_cf_format(make_env):
+    env = make_env()
+    env.reset()
+    env.step(np.array([101325.123]))
+
+    assert env.cf_values == ['1.01325123E+05']
+    with open(env.melin_path) as f:
+        assert 'CF00700 CONTROLLER MULTIPLY 2 1.01325123E+05\n' in f.readlines()
+
+
+def test_pinned_processes(make_env):
+    env = make_env(cpus=[min(os.sched_getaffinity(0))] if hasattr(os, 'sched_getaffinity') else None,
+                   niceness=2, n_threads=1)
+    env.reset()
+    obs, _, _, _, info = env.step(np.array([2.0]))
+
+    assert obs.tolist() == [2.0]
+    assert 0.0 <= info['cpu_utilization']
+
+
+def test_pool(make_env):
+    env = make_env(pool_size=2)
+    env.reset()
+    env.step(np.array([2.0]))
+    env.reset()
+
+    assert env.pool_dir.startswith(env.pool_root)
+    obs, _, _, _, info = env.step(np.array([1.0]))
+    assert info['TIME'] == 10.0 and obs.tolist() == [1.0]
+
+
+def test_pool_failure_fallback(make_env, monkeypatch):
+    monkeypatch.setenv('STUB_MELGEN_FAIL', '1')
+    env = make_env(pool_size=1)
+
+    with pytest.warns(MelgymWarning, match='Pre-reset failed'):
+        env.reset()
+    assert env.pool_failures == 1
+    obs, _, _, _, _ = env.step(np.array([2.0]))
+    assert obs.tolist() == [2.0]
+
+
+def test_shared_pool_dir(make_env, tmp_path):
+    shared = tmp_path / 'pool'
+    shared.mkdir()
+    (shared / 'unrelated').write_text('keep')
+    first = make_env(output_dir='first', pool_size=1, pool_dir=str(shared))
+    second = make_env(output_dir='second', pool_size=1, pool_dir=str(shared))
+    first.reset()
+    second.reset()
+    first.close()
+
+    assert (shared / 'unrelated').exists()
+    second.reset()
+    assert second.step(np.array([1.0]))[0].tolist() == [1.0]
+
+
+def test_metrics(make_env):
+    from melgym.utils.metrics import MetricsRegistry
+
+    registry = MetricsRegistry()
+    env = make_env(metrics=registry)
+    env.reset()
+    env.step(np.array([1.0]))
+
+    lines = registry.to_prometheus().splitlines()
+    assert 'melgym_steps_total{env="out"} 1.0' in lines
+    assert 'melgym_resets_total{env="out"} 1.0' in lines
+    assert 'melgym_melcor_seconds_count{env="out"} 1' in lines
@@ -0,0 +1,70 @@
+import json
+import pickle
+import urllib.request
+
+from melgym.utils.metrics import JsonLinesExporter, MetricsRegistry, PrometheusExporter
+
+
+def test_to_prometheus():
+    registry = MetricsRegistry()
+    registry.counter('steps_total', 'Steps.').inc(2, env='a')
+    registry.gauge('pool_depth').set(3)
+    registry.histogram('step_seconds', buckets=(0.1, 1.0, float('inf'))).observe(0.5, env='a')
+
+    lines = registry.to_prometheus().splitlines()
+    assert '# HELP melgym_steps_total Steps.' in lines
+    assert '# TYPE melgym_steps_total counter' in lines
+    assert 'melgym_steps_total{env="a"} 2.0' in lines
+    assert 'melgym_pool_depth 3' in lines
+    assert 'melgym_step_seconds_bucket{env="a",le="0.1"} 0' in lines
+    assert 'melgym_step_seconds_bucket{env="a",le="+Inf"} 1' in lines
+    assert 'melgym_step_seconds_sum{env="a"} 0.5' in lines
+    assert 'melgym_step_seconds_count{env="a"} 1' in lines
+
+
+def test_escaping():
+    registry = MetricsRegistry()
+    registry.counter('steps_total', 'Back\\slash\nnewline').inc(env='a"b\\c\nd')
+
+    lines = registry.to_prometheus().splitlines()
+    assert lines[0] == '# HELP melgym_steps_total Back\\\\slash\\nnewline'
+    assert lines[2] == 'melgym_steps_total{env="a\\"b\\\\c\\nd"} 1.0'
+
+
+def test_same_metric():
+    registry = MetricsRegistry()
+    assert registry.counter('steps_total') is registry.counter('steps_total')
+
+
+def test_pickle():
+    registry = MetricsRegistry()
+    registry.counter('steps_total').inc(2)
+
+    copy = pickle.loads(pickle.dumps(registry))
+    copy.counter('steps_total').inc()
+    assert 'melgym_steps_total 3.0' in copy.to_prometheus().splitlines()
+    assert 'melgym_steps_total 2.0' in registry.to_prometheus().splitlines()
+
+
+def test_prometheus_exporter():
+    registry = MetricsRegistry()
+    registry.counter('steps_total').inc()
+    exporter = PrometheusExporter(registry, port=0)
+    exporter.start()
+    try:
+        with urllib.request.urlopen(f'http://127.0.0.1:{exporter.port}/metrics') as response:
+            assert 'melgym_steps_total 1.0' in response.read().decode()
+    finally:
+        exporter.stop()
+
+
+def test_json_lines_exporter(tmp_path):
+    registry = MetricsRegistry()
+    registry.gauge('pool_depth').set(2, env='a')
+    exporter = JsonLinesExporter(registry, str(tmp_path / 'metrics.jsonl'), interval=60)
+    exporter.start()
+    exporter.stop()
+
+    with open(tmp_path / 'metrics.jsonl') as f:
+        snapshot = json.loads(f.readline())
+    assert snapshot['samples'] == [{'name': 'melgym_pool_depth', 'labels': {'env': 'a'}, 'value': 2}]
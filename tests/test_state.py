@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+import pytest
+
+from melgym.utils.exceptions import MelgymError, MelgymWarning
+
+
+def run(env, actions):
+    return [env.step(np.array([action]))[0].tolist() for action in actions]
+
+
+def test_round_trip(make_env, tmp_path):
+    env = make_env()
+    env.reset()
+    run(env, [1.0, 2.0])
+    env.save_state(str(tmp_path / 'ckpt'))
+    expected = run(env, [3.0, 4.0])
+
+    restored = make_env(output_dir='restored')
+    restored.load_state(str(tmp_path / 'ckpt'))
+    assert restored.n_steps == 3 and restored.current_tend == 20
+    assert run(restored, [3.0, 4.0]) == expected
+
+    # The EDF keeps its history, without the rows written after the checkpoint
+    with open(restored.edf_path) as f:
+        assert [float(line.split()[0]) for line in f] == [20.0, 30.0, 40.0]
+
+
+def test_edf_truncation(make_env, tmp_path):
+    env = make_env()
+    env.reset()
+    run(env, [1.0])
+    env.save_state(str(tmp_path / 'ckpt'))
+    run(env, [2.0, 3.0])
+
+    env.load_state(str(tmp_path / 'ckpt'))
+    with open(env.edf_path) as f:
+        assert [float(line.split()[0]) for line in f] == [10.0]
+    assert run(env, [5.0]) == [[6.0]]
+
+
+def test_previous_checkpoint_fallback(make_env, tmp_path):
+    env = make_env()
+    env.reset()
+    run(env, [1.0])
+    path = str(tmp_path / 'ckpt')
+    env.save_state(path)
+    env.save_state(path)
+    assert not [p for p in os.listdir(tmp_path) if p.startswith('ckpt.')]
+
+    # Crash between moving the previous checkpoint away and renaming the new one
+    os.rename(path, path + '.old-deadbeef')
+    restored = make_env(output_dir='restored')
+    with pytest.warns(MelgymWarning):
+        restored.load_state(path)
+    assert run(restored, [2.0]) == [[3.0]]
+
+
+def test_incomplete_checkpoint(make_env, tmp_path):
+    env = make_env()
+    env.reset()
+    run(env, [1.0])
+    path = tmp_path / 'ckpt'
+    env.save_state(str(path))
+    os.remove(path / 'MELRST')
+
+    with pytest.raises(MelgymError, match='incomplete'):
+        env.load_state(str(path))
+    # The live episode is untouched
+    assert run(env, [2.0]) == [[3.0]]
+
+
+def test_other_control_setup(make_env, tmp_path):
+    env = make_env()
+    env.reset()
+    run(env, [1.0])
+    env.save_state(str(tmp_path / 'ckpt'))
+
+    other = make_env(output_dir='other', control_cfs=['CF001'])
+    with pytest.raises(MelgymError):
+        other.load_state(str(tmp_path / 'ckpt'))
+
+
+def test_missing_checkpoint(make_env, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        make_env().load_state(str(tmp_path / 'missing'))
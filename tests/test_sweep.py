@@ -0,0 +1,39 @@
+import pytest
+
+from melgym.utils.exceptions import MelgymError
+from melgym.utils.sweep import SweepRunner, run_id
+
+
+def make_runner(tmp_path, **kwargs):
+    return SweepRunner('pressure-v0', kwargs.pop('env_grid', {'control_horizon': [5, 10]}),
+                       agent_cls=object, results_dir=str(tmp_path), **kwargs)
+
+
+def test_grid(tmp_path):
+    runner = make_runner(tmp_path, agent_grid={'learning_rate': [1e-3, 1e-4]}, seeds=[0, 1])
+    configs = runner.configs()
+
+    assert len(configs) == 8
+    assert len({config['run_id'] for config in configs}) == 8
+    assert {config['env_params']['control_horizon'] for config in configs} == {5, 10}
+
+
+def test_random(tmp_path):
+    runner = make_runner(tmp_path, mode='random', n_samples=20)
+    configs = runner.configs()
+
+    # Repeated samples are only included once
+    assert 1 <= len(configs) <= 2
+    assert configs == make_runner(tmp_path, mode='random', n_samples=20).configs()
+
+
+def test_run_id():
+    assert run_id({'a': 1, 'b': 2}, {}, 0) == run_id({'b': 2, 'a': 1}, {}, 0)
+    assert run_id({'a': 1}, {}, 0) != run_id({'a': 1}, {}, 1)
+
+
+def test_invalid_mode(tmp_path):
+    with pytest.raises(MelgymError):
+        make_runner(tmp_path, mode='bayesian')
+    with pytest.raises(MelgymError):
+        make_runner(tmp_path, mode='random')
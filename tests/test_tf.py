@@ -0,0 +1,37 @@
+import pytest
+
+from melgym.utils.exceptions import MelgymError
+from melgym.utils.tf import TF_MAX_PAIRS, tf_records
+
+HEADER = ['SCHEDULE', '2', '1.0']
+
+
+def test_tf_records():
+    points = [(0.0, 1.0), (9.99, 1.0), (10.0, 2.0)]
+    lines = tf_records('TF007', HEADER, points, '{:.3E}'.format)
+
+    assert lines == ['TF00700 SCHEDULE 3 1.0\n',
+                     'TF00710 0.0 1.000E+00 9.99 1.000E+00\n',
+                     'TF00711 10.0 2.000E+00\n']
+
+
+def test_tf_records_time_precision():
+    # Times are not rounded to the precision of the values
+    points = [(1000.0, 1.0), (1009.99, 1.0), (1010.0, 2.0), (1020.0, 2.0)]
+    lines = tf_records('TF007', HEADER, points, '{:.3E}'.format)
+
+    x_values = [float(x) for line in lines[1:] for x in line.split()[1::2]]
+    assert x_values == [1000.0, 1009.99, 1010.0, 1020.0]
+
+
+def test_tf_records_not_increasing():
+    points = [(1009.99, 1.0), (1010.0, 2.0)]
+    with pytest.raises(MelgymError):
+        tf_records('TF007', HEADER, points, '{:.3E}'.format, x_fmt='{:.3E}'.format)
+
+
+@pytest.mark.parametrize('n_points', [0, TF_MAX_PAIRS + 1])
+def test_tf_records_size(n_points):
+    points = [(float(i), 1.0) for i in range(n_points)]
+    with pytest.raises(MelgymError):
+        tf_records('TF007', HEADER, points, '{:.3E}'.format)